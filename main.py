@@ -17,7 +17,8 @@ from scripts.graficar_soc import (
     graficar_soc_diario, 
     graficar_comparacion_estaciones, 
     graficar_balance_energetico,
-    crear_resumen_estadisticas
+    crear_resumen_estadisticas,
+    cerrar_figuras
 )
 
 
@@ -273,45 +274,49 @@ def ejecutar_simulacion_completa(
     # 6. Generar gráficos
     print(f"\n📊 GENERANDO GRÁFICOS:")
     
-    # Gráfico SOC diario invierno
-    graficar_soc_diario(
-        soc_invierno,
-        "Simulación SOC - Invierno",
-        True,
-        "results/soc_invierno_diario.png"
-    )
-    
-    # Gráfico SOC diario verano
-    graficar_soc_diario(
-        soc_verano,
-        "Simulación SOC - Verano",
-        True,
-        "results/soc_verano_diario.png"
-    )
-    
-    # Gráfico comparativo
-    graficar_comparacion_estaciones(
-        soc_invierno,
-        soc_verano,
-        True,
-        "results/comparacion_estaciones.png"
-    )
-    
-    # Gráfico balance energético invierno
-    graficar_balance_energetico(
-        soc_invierno,
-        "Balance Energético - Invierno",
-        True,
-        "results/balance_energetico_invierno.png"
-    )
-    
-    # Gráfico balance energético verano
-    graficar_balance_energetico(
-        soc_verano,
-        "Balance Energético - Verano",
-        True,
-        "results/balance_energetico_verano.png"
-    )
+    # La figura compartida de graficar_soc se cierra aunque falle algún gráfico
+    try:
+        # Gráfico SOC diario invierno
+        graficar_soc_diario(
+            soc_invierno,
+            "Simulación SOC - Invierno",
+            True,
+            "results/soc_invierno_diario.png"
+        )
+        
+        # Gráfico SOC diario verano
+        graficar_soc_diario(
+            soc_verano,
+            "Simulación SOC - Verano",
+            True,
+            "results/soc_verano_diario.png"
+        )
+        
+        # Gráfico comparativo
+        graficar_comparacion_estaciones(
+            soc_invierno,
+            soc_verano,
+            True,
+            "results/comparacion_estaciones.png"
+        )
+        
+        # Gráfico balance energético invierno
+        graficar_balance_energetico(
+            soc_invierno,
+            "Balance Energético - Invierno",
+            True,
+            "results/balance_energetico_invierno.png"
+        )
+        
+        # Gráfico balance energético verano
+        graficar_balance_energetico(
+            soc_verano,
+            "Balance Energético - Verano",
+            True,
+            "results/balance_energetico_verano.png"
+        )
+    finally:
+        cerrar_figuras()
     
     # 7. Crear resumen
     crear_resumen_estadisticas(
@@ -10,14 +10,123 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+import matplotlib.ticker as mticker
 from datetime import datetime, timedelta
-import seaborn as sns
+import re
+from concurrent.futures import ProcessPoolExecutor
 import warnings
 warnings.filterwarnings('ignore')
 
-# Configurar estilo de gráficos
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
+# El estilo de gráficos se aplica una sola vez, al crear el primer ProcesadorTMY
+_ESTILO_CONFIGURADO = False
+
+def _configurar_estilo():
+    """Configurar estilo de gráficos (seaborn) sólo la primera vez que se necesita."""
+    global _ESTILO_CONFIGURADO
+    if _ESTILO_CONFIGURADO:
+        return
+    import seaborn as sns
+    plt.style.use('seaborn-v0_8')
+    sns.set_palette("husl")
+    _ESTILO_CONFIGURADO = True
+
+# Línea de metadatos "clave,valor" (ignora separadores '---' y líneas entre comillas)
+_META_RE = re.compile(r'^([^-"][^,]*),(.*)$')
+
+# Tipos explícitos de las columnas del CSV TMY (evita la inferencia de tipos al leer)
+DTYPES_TMY = {
+    'Fecha/Hora': 'string',
+    'glb': 'float64',
+    'dir': 'float64',
+    'dif': 'float64',
+    'sct': 'float64',
+    'ghi': 'float64',
+    'dirh': 'float64',
+    'difh': 'float64',
+    'dni': 'float64',
+    'temp': 'float64',
+    'vel': 'float64',
+    'shadow': 'float64',
+    'cloud': 'float64',
+}
+
+# Etiquetas de mes precalculadas (evita strftime por tick en cada redibujado)
+_MESES_ABREV = np.array(['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun',
+                         'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic'])
+
+def _ticks_mensuales(ax, fechas):
+    """
+    Fijar un tick al inicio de cada mes con su abreviatura precalculada.
+    
+    Args:
+        ax: Eje de matplotlib con fechas en el eje X
+        fechas (array-like): Fechas graficadas (para acotar el rango de meses)
+    """
+    fechas = np.asarray(fechas, dtype='datetime64[ns]')
+    primera, ultima = fechas.min(), fechas.max()
+    meses = np.arange(primera.astype('datetime64[M]'), ultima.astype('datetime64[M]') + 1)
+    meses = meses[meses >= primera]
+    ax.xaxis.set_major_locator(mticker.FixedLocator(mdates.date2num(meses.astype('datetime64[D]'))))
+    ax.xaxis.set_major_formatter(mticker.FixedFormatter(_MESES_ABREV[meses.astype(np.int64) % 12]))
+
+# Estadísticas mensuales (una fila por mes) como arreglo estructurado de numpy
+DTYPE_MENSUAL = np.dtype([
+    ('mes', 'i1'),
+    ('ghi_mean', 'f8'),
+    ('ghi_max', 'f8'),
+    ('gmod_35_mean', 'f8'),
+    ('gmod_35_max', 'f8'),
+    ('temp_mean', 'f8'),
+    ('temp_max', 'f8'),
+    ('temp_min', 'f8'),
+])
+
+def _decimar_extremos(x, y, max_puntos=1500):
+    """
+    Reduce una serie a lo más max_puntos puntos para graficarla, conservando
+    el mínimo y el máximo de cada tramo (los picos se ven igual que con la serie completa).
+    
+    Args:
+        x (np.ndarray): Eje X (fechas o números)
+        y (np.ndarray): Valores de la serie
+        max_puntos (int): Número máximo de puntos a dibujar
+    
+    Returns:
+        tuple: (x_decimado, y_decimado)
+    """
+    n = len(y)
+    if n <= max_puntos:
+        return x, y
+    
+    # Tramos de igual tamaño; el último se rellena con NaN para poder usar reshape
+    tamano = -(-n // (max_puntos // 2))
+    n_tramos = -(-n // tamano)
+    y_tramos = np.full(n_tramos * tamano, np.nan)
+    y_tramos[:n] = y
+    y_tramos = y_tramos.reshape(n_tramos, tamano)
+    
+    base = np.arange(n_tramos) * tamano
+    indices = np.concatenate([base + np.nanargmin(y_tramos, axis=1),
+                              base + np.nanargmax(y_tramos, axis=1)])
+    indices = np.unique(indices[indices < n])
+    
+    return x[indices], y[indices]
+
+def _renderizar_en_proceso(procesador, metodo):
+    """
+    Ejecutar un método graficar_* del procesador en un proceso hijo.
+    
+    Cada proceso usa su propio backend Agg (no compartido entre hilos), por lo que
+    figuras independientes se pueden rasterizar en paralelo.
+    
+    Args:
+        procesador (ProcesadorTMY): Procesador con los datos ya cargados
+        metodo (str): Nombre del método de graficado a ejecutar
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    _configurar_estilo()
+    getattr(procesador, metodo)()
 
 class ProcesadorTMY:
     """Clase para procesar archivos TMY (Typical Meteorological Year)"""
@@ -32,6 +141,7 @@ class ProcesadorTMY:
         self.archivo_csv = archivo_csv
         self.datos = None
         self.metadatos = {}
+        _configurar_estilo()
         
     def scanner_archivo(self):
         """Realizar un escaneo completo del archivo para entender su estructura"""
@@ -49,15 +159,12 @@ class ProcesadorTMY:
         print("\n📋 METADATOS DEL ARCHIVO:")
         print("-" * 40)
         
-        for i, linea in enumerate(lineas[:25], 1):
-            linea = linea.strip()
-            if linea and not linea.startswith('-') and not linea.startswith('"'):
-                if ',' in linea:
-                    partes = linea.split(',', 1)  # Solo dividir en la primera coma
-                    if len(partes) == 2:
-                        clave, valor = partes
-                        print(f"  {clave}: {valor}")
-                        self.metadatos[clave] = valor
+        for linea in lineas[:25]:
+            coincidencia = _META_RE.match(linea.strip())
+            if coincidencia:
+                clave, valor = coincidencia.groups()  # Solo se divide en la primera coma
+                print(f"  {clave}: {valor}")
+                self.metadatos[clave] = valor
         
         # Analizar variables (líneas 26-38)
         print("\n📊 VARIABLES DISPONIBLES:")
@@ -117,7 +224,10 @@ class ProcesadorTMY:
         
         # Leer datos directamente (saltando metadatos y línea de encabezados)
         # Usar engine='python' para manejar mejor el formato
-        self.datos = pd.read_csv(self.archivo_csv, skiprows=41, encoding='utf-8', engine='python')
+        # Tipos fijos (float64) para no inferirlos columna a columna; se mantiene
+        # float64 porque los valores se redondean y exportan a data/Recurso_solar.xlsx
+        self.datos = pd.read_csv(self.archivo_csv, skiprows=41, encoding='utf-8', engine='python',
+                                 dtype=DTYPES_TMY)
         
         # Convertir fecha a datetime
         self.datos['fecha_tmy'] = pd.to_datetime(self.datos['Fecha/Hora'])
@@ -188,25 +298,37 @@ class ProcesadorTMY:
         
         return self.datos
     
-    def graficar_radiacion_anual(self, guardar_grafico=True):
-        """Graficar Irradiancia GHI y Gmod para un año completo"""
+    def graficar_radiacion_anual(self, guardar_grafico=True, mostrar=False, dpi=300):
+        """
+        Graficar Irradiancia GHI y Gmod para un año completo
+        
+        Args:
+            guardar_grafico (bool): Si guardar el gráfico como PNG
+            mostrar (bool): Si abrir la ventana interactiva; si es False la figura se cierra tras guardarla
+            dpi (int): Resolución del PNG (150 basta para iterar, 300 para la exportación final)
+        """
         print("\n📊 GENERANDO GRÁFICO ANUAL...")
         
-        # Crear figura con subplots
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(15, 10))
+        # Crear figura con subplots (constrained_layout evita el ajuste posterior con tight_layout)
+        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(15, 10), constrained_layout=True)
+        
+        # Decimar solo para dibujar (los datos completos quedan en self.datos)
+        fechas = self.datos['fecha_tmy'].to_numpy()
+        fechas_ghi, ghi = _decimar_extremos(fechas, self.datos['ghi'].to_numpy())
+        fechas_gmod, gmod = _decimar_extremos(fechas, self.datos['gmod_35'].to_numpy())
         
         # Gráfico 1: Irradiancia GHI (Global Horizontal)
-        ax1.plot(self.datos['fecha_tmy'], self.datos['ghi'], 
+        ax1.plot(fechas_ghi, ghi, 
                 color='orange', linewidth=0.8, alpha=0.7, label='GHI (Global Horizontal)')
         ax1.set_title('Irradiancia Solar Global Horizontal (GHI) - TMY Antofagasta', 
                      fontsize=16, fontweight='bold')
         ax1.set_ylabel('Irradiancia (W/m²)', fontsize=12)
         ax1.legend(fontsize=12)
         ax1.grid(True, alpha=0.3)
-        ax1.xaxis.set_major_formatter(mdates.DateFormatter('%b'))
+        _ticks_mensuales(ax1, fechas)
         
         # Gráfico 2: Irradiancia Gmod inclinado a 35°
-        ax2.plot(self.datos['fecha_tmy'], self.datos['gmod_35'], 
+        ax2.plot(fechas_gmod, gmod, 
                 color='blue', linewidth=0.8, alpha=0.7, label='Gmod (Inclinado 35°)')
         ax2.set_title('Irradiancia Solar Gmod Inclinado a 35° - TMY Antofagasta', 
                      fontsize=16, fontweight='bold')
@@ -214,16 +336,17 @@ class ProcesadorTMY:
         ax2.set_xlabel('Mes', fontsize=12)
         ax2.legend(fontsize=12)
         ax2.grid(True, alpha=0.3)
-        ax2.xaxis.set_major_formatter(mdates.DateFormatter('%b'))
-        
-        plt.tight_layout()
+        _ticks_mensuales(ax2, fechas)
         
         if guardar_grafico:
             nombre_archivo = 'OFFGRID/results/radiacion_solar_tmy_antofagasta.png'
-            plt.savefig(nombre_archivo, dpi=300, bbox_inches='tight')
+            fig.savefig(nombre_archivo, dpi=dpi, bbox_inches='tight')
             print(f"💾 Gráfico guardado como: {nombre_archivo}")
         
-        plt.show()
+        if mostrar:
+            plt.show()
+        else:
+            plt.close(fig)
         
         return fig
     
@@ -231,31 +354,43 @@ class ProcesadorTMY:
         """Graficar comparación mensual de Irradiancia GHI vs GLB"""
         print("\n📊 GENERANDO GRÁFICO COMPARATIVO MENSUAL...")
         
-        # Calcular estadísticas mensuales
-        datos_mensuales = self.datos.groupby(self.datos['fecha_tmy'].dt.month).agg({
-            'ghi': ['mean', 'max'],
-            'gmod_35': ['mean', 'max'],
-            'temp': ['mean', 'max', 'min']
-        }).round(2)
+        # Calcular estadísticas mensuales con reducciones por tramo (datos ordenados por mes)
+        mes_datos = self.datos['fecha_tmy'].dt.month.to_numpy()
+        orden = np.argsort(mes_datos, kind='stable')
+        meses_presentes, inicios, conteos = np.unique(mes_datos[orden], return_index=True, return_counts=True)
+        valores = self.datos[['ghi', 'gmod_35', 'temp']].to_numpy(dtype=np.float64)[orden]
         
-        # Aplanar columnas
-        datos_mensuales.columns = ['ghi_mean', 'ghi_max', 'gmod_35_mean', 'gmod_35_max', 'temp_mean', 'temp_max', 'temp_min']
-        datos_mensuales = datos_mensuales.reset_index()
+        medias = (np.add.reduceat(valores, inicios, axis=0) / conteos[:, None]).round(2)
+        maximos = np.maximum.reduceat(valores, inicios, axis=0).round(2)
+        minimos = np.minimum.reduceat(valores, inicios, axis=0).round(2)
+        
+        datos_mensuales = np.empty(len(meses_presentes), dtype=DTYPE_MENSUAL)
+        datos_mensuales['mes'] = meses_presentes
+        datos_mensuales['ghi_mean'], datos_mensuales['gmod_35_mean'], datos_mensuales['temp_mean'] = medias.T
+        datos_mensuales['ghi_max'], datos_mensuales['gmod_35_max'], datos_mensuales['temp_max'] = maximos.T
+        datos_mensuales['temp_min'] = minimos[:, 2]
         
         # Mostrar estadísticas de temperatura por mes
         print(f"\n🌡️  ESTADÍSTICAS DE TEMPERATURA POR MES:")
         print("=" * 60)
         meses = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic']
         for i, mes in enumerate(meses):
-            temp_min = datos_mensuales.loc[i, 'temp_min']
-            temp_max = datos_mensuales.loc[i, 'temp_max']
-            temp_mean = datos_mensuales.loc[i, 'temp_mean']
+            temp_min = datos_mensuales['temp_min'][i]
+            temp_max = datos_mensuales['temp_max'][i]
+            temp_mean = datos_mensuales['temp_mean'][i]
             print(f"{mes}: Min={temp_min:.1f}°C, Max={temp_max:.1f}°C, Prom={temp_mean:.1f}°C")
         
         return datos_mensuales
     
-    def graficar_solsticios(self, guardar_grafico=True):
-        """Graficar Irradiancia GHI y GLB para los solsticios (20 junio y 21 diciembre)"""
+    def graficar_solsticios(self, guardar_grafico=True, mostrar=False, dpi=600):
+        """
+        Graficar Irradiancia GHI y GLB para los solsticios (20 junio y 21 diciembre)
+        
+        Args:
+            guardar_grafico (bool): Si guardar el gráfico como PNG
+            mostrar (bool): Si abrir la ventana interactiva; si es False la figura se cierra tras guardarla
+            dpi (int): Resolución del PNG
+        """
         print("\n📊 GENERANDO GRÁFICO DE SOLSTICIOS...")
         
         # Filtrar datos para 21 de junio y 21 de diciembre
@@ -268,7 +403,7 @@ class ProcesadorTMY:
         ].copy()
         
         # Crear figura con subplots
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 12))
+        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 12), constrained_layout=True)
         
         # Gráfico 1: Solsticio de Verano (20 de Junio)
         horas_verano = solsticio_verano['hora']
@@ -378,14 +513,15 @@ class ProcesadorTMY:
                 transform=ax2.transAxes, verticalalignment='top', fontsize=14,
                 bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
         
-        plt.tight_layout()
-        
         if guardar_grafico:
             nombre_archivo = 'OFFGRID/results/solsticios_tmy_antofagasta.png'
-            plt.savefig(nombre_archivo, dpi=600, bbox_inches='tight')
+            fig.savefig(nombre_archivo, dpi=dpi, bbox_inches='tight')
             print(f"💾 Gráfico guardado como: {nombre_archivo}")
         
-        plt.show()
+        if mostrar:
+            plt.show()
+        else:
+            plt.close(fig)
         
         # Imprimir comparación
         print(f"\n📊 COMPARACIÓN DE SOLSTICIOS:")
@@ -433,25 +569,30 @@ class ProcesadorTMY:
         """Generar un reporte completo de los datos"""
         print("\n📋 GENERANDO REPORTE...")
         
-        # Calcular estadísticas
+        # Calcular estadísticas de ambas series en un solo bloque numpy (columnas: GHI, Gmod)
+        irradiancia = self.datos[['ghi', 'gmod_35']].to_numpy(dtype=np.float64)
+        medias = irradiancia.mean(axis=0)
+        maximos = irradiancia.max(axis=0)
+        minimos = irradiancia.min(axis=0)
+        desviaciones = irradiancia.std(axis=0, ddof=1)
+        
         ghi_stats = {
-            'media': self.datos['ghi'].mean(),
-            'max': self.datos['ghi'].max(),
-            'min': self.datos['ghi'].min(),
-            'std': self.datos['ghi'].std()
+            'media': medias[0],
+            'max': maximos[0],
+            'min': minimos[0],
+            'std': desviaciones[0]
         }
         
         gmod_stats = {
-            'media': self.datos['gmod_35'].mean(),
-            'max': self.datos['gmod_35'].max(),
-            'min': self.datos['gmod_35'].min(),
-            'std': self.datos['gmod_35'].std()
+            'media': medias[1],
+            'max': maximos[1],
+            'min': minimos[1],
+            'std': desviaciones[1]
         }
         
         # Calcular energía anual (kWh/m²)
         # Los datos TMY están en W/m² como valores promedio por hora
-        energia_ghi_anual = self.datos['ghi'].sum() / 1000  # kWh/m²
-        energia_gmod_anual = self.datos['gmod_35'].sum() / 1000  # kWh/m²
+        energia_ghi_anual, energia_gmod_anual = irradiancia.sum(axis=0) / 1000  # kWh/m²
         
         # Generar reporte
         reporte = f"""
@@ -1156,7 +1297,7 @@ class ProcesadorTMY:
         ax1.set_xlabel('Fecha', fontsize=12)
         ax1.legend()
         ax1.grid(True, alpha=0.3)
-        ax1.xaxis.set_major_formatter(mdates.DateFormatter('%b'))
+        _ticks_mensuales(ax1, indice_diario['fecha'])
         
         # Gráfico 2: Distribución de clasificaciones
         conteo_dias = indice_diario['clasificacion'].value_counts()
@@ -1546,7 +1687,7 @@ class ProcesadorTMY:
         ax1.set_title('Clasificación Diaria de Nubosidad - Año TMY', fontsize=14, fontweight='bold')
         ax1.set_ylabel('Clasificación', fontsize=12)
         ax1.set_xlabel('Fecha', fontsize=12)
-        ax1.xaxis.set_major_formatter(mdates.DateFormatter('%b'))
+        _ticks_mensuales(ax1, indice_diario['fecha'])
         
         # Crear leyenda personalizada
         from matplotlib.patches import Patch
@@ -1727,9 +1868,14 @@ def main():
     
     # Generar gráficos originales
     print("\n🎨 GENERANDO GRÁFICOS ORIGINALES...")
-    procesador.graficar_radiacion_anual()
-    procesador.graficar_comparacion_mensual()
-    procesador.graficar_solsticios()
+    # Los dos gráficos son independientes: se rasterizan en paralelo en procesos
+    # separados mientras el proceso principal calcula el resumen mensual
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        futuros = [pool.submit(_renderizar_en_proceso, procesador, metodo)
+                   for metodo in ('graficar_radiacion_anual', 'graficar_solsticios')]
+        procesador.graficar_comparacion_mensual()
+        for futuro in futuros:
+            futuro.result()
     
     # Exportar días seleccionados a Excel
     print("\n📊 EXPORTANDO DATOS A EXCEL...")
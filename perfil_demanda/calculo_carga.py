@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import pandas as pd
+import numpy as np
 import matplotlib
 # usar backend no interactivo de forma explícita (opcional)
 matplotlib.use("Agg")
@@ -47,8 +48,8 @@ def main():
     df["Hour"] = df["Hora"].astype(float).apply(lambda x: int(x))
     print(f"   Horas únicas: {sorted(df['Hour'].unique())}")
     
-    # Agrupar por hora
-    df_hourly = df.groupby("Hour")[carga_cols].sum()
+    # Agrupar por hora (las horas ya vienen ordenadas en el Excel, no hace falta reordenar)
+    df_hourly = df.groupby("Hour", sort=False)[carga_cols].sum()
     print(f"\n📈 DATOS AGRUPADOS POR HORA:")
     print(f"   Filas resultantes: {len(df_hourly)}")
     print(f"   Columnas: {list(df_hourly.columns)}")
@@ -61,7 +62,7 @@ def main():
     
     # Formatear índice
     df_hourly.index = df_hourly.index.map(lambda h: f"{h:02d}:00")
-    df_hourly["Total"] = df_hourly.sum(axis=1)
+    df_hourly["Total"] = np.nansum(df_hourly[carga_cols].to_numpy(), axis=1)  # celdas vacías cuentan como 0
     
     print(f"\n📊 TOTALES POR HORA:")
     for hora, total in df_hourly["Total"].items():
@@ -4,6 +4,17 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+
+# Raíz del proyecto en el path para importar las utilidades compartidas de scripts/
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from scripts.utilidades import leer_excel_cacheado, trapecio_uniforme
+
+# Ticks del eje horario (cada 2 h), calculados una sola vez para todas las estaciones
+_HORA_TICKS = np.arange(0, 25, 2)
+_HORA_LABELS = [f"{h:02d}:00" for h in _HORA_TICKS]
 
 def analizar_estacion(estacion, sheet_name, recurso_solar_file, cargas_file):
     """Analiza una estación específica (invierno o verano)"""
@@ -20,7 +31,7 @@ def analizar_estacion(estacion, sheet_name, recurso_solar_file, cargas_file):
     print(f"\n🔍 DIAGNÓSTICO DE DATOS SOLARES")
     print("=" * 50)
     
-    df_solar = pd.read_excel(recurso_solar_file, sheet_name=sheet_name)
+    df_solar = leer_excel_cacheado(recurso_solar_file, sheet_name=sheet_name)
     print(f"📁 Archivo solar: {recurso_solar_file}")
     print(f"📋 Hoja: {sheet_name}")
     print(f"✅ Datos solares cargados: {len(df_solar)} filas x {len(df_solar.columns)} columnas")
@@ -47,6 +58,11 @@ def analizar_estacion(estacion, sheet_name, recurso_solar_file, cargas_file):
     
     df_solar['Fecha_Hora'] = pd.to_datetime(df_solar['Fecha_Hora'])
     
+    # Columnas solares como arrays numpy, extraídas una sola vez para cálculos y gráficos
+    hora_solar = df_solar['Hora'].to_numpy(dtype=float)
+    ghi_solar = df_solar['GHI_W_m2'].to_numpy()
+    gmod_solar = df_solar['Gmod'].to_numpy()
+    
     print(f"\n📈 ESTADÍSTICAS SOLARES:")
     print(f"   GHI máximo: {df_solar['GHI_W_m2'].max():.1f} W/m²")
     print(f"   GHI mínimo: {df_solar['GHI_W_m2'].min():.1f} W/m²")
@@ -60,7 +76,7 @@ def analizar_estacion(estacion, sheet_name, recurso_solar_file, cargas_file):
     print(f"\n🔍 DIAGNÓSTICO DE DATOS DE CONSUMO")
     print("=" * 50)
     
-    df_cargas = pd.read_excel(cargas_file, header=0)
+    df_cargas = leer_excel_cacheado(cargas_file)
     print(f"📁 Archivo de cargas: {cargas_file}")
     print(f"✅ Datos cargados: {len(df_cargas)} filas x {len(df_cargas.columns)} columnas")
     
@@ -94,7 +110,7 @@ def analizar_estacion(estacion, sheet_name, recurso_solar_file, cargas_file):
     print(f"   Horas únicas en datos: {sorted(df_cargas['Hour'].unique())}")
     
     # Calcular consumo total por fila
-    df_cargas["Total_Consumo"] = df_cargas[carga_cols].sum(axis=1)
+    df_cargas["Total_Consumo"] = np.nansum(df_cargas[carga_cols].to_numpy(), axis=1)  # celdas vacías cuentan como 0
     print(f"\n📊 CONSUMO TOTAL POR FILA:")
     print(f"   Consumo máximo por fila: {df_cargas['Total_Consumo'].max():.1f} W")
     print(f"   Consumo mínimo por fila: {df_cargas['Total_Consumo'].min():.1f} W")
@@ -130,10 +146,13 @@ def analizar_estacion(estacion, sheet_name, recurso_solar_file, cargas_file):
     
     PR = 0.8
     ef_inv = 0.976
+    
+    # Factor de conversión Gmod (W/m²) → potencia AC (W), calculado una sola vez
+    factor_generacion = area_modulo * eficiencia * num_modulos * PR * ef_inv #(1 - perdidas)
 
     # 4. CALCULAR GENERACIÓN FOTOVOLTAICA
     # Usar Gmod (irradiancia en el plano del módulo)
-    df_solar['Generacion_PV'] = (df_solar['Gmod'] * area_modulo * eficiencia * num_modulos * PR * ef_inv) #(1 - perdidas))
+    df_solar['Generacion_PV'] = gmod_solar * factor_generacion
     # ▸ Comprobación paso a paso
     print("=== CHECK INTERMEDIO ===")
     print(f"Hβ integrada ............... {df_solar['Gmod'].sum()/1000:.2f} kWh/m²")
@@ -145,7 +164,8 @@ def analizar_estacion(estacion, sheet_name, recurso_solar_file, cargas_file):
     print(f"Energía AC diaria calculada  {df_solar['Generacion_PV'].sum()/1000:.2f} kWh")
     print("==========================")
     
-    H_inv_real = np.trapz(df_solar['Gmod'], df_solar['Hora']) / 1000  # kWh/m²
+    # trapecio_uniforme exige la Hora solar equiespaciada (resolución horaria)
+    H_inv_real = trapecio_uniforme(gmod_solar, hora_solar) / 1000  # kWh/m²
     print(f"🔎 Gmod integrado (hoja Excel) = {H_inv_real:.2f} kWh/m² día")
 
     # 5. EXPANDIR DATOS SOLARES PARA COINCIDIR CON RESOLUCIÓN DE CARGAS
@@ -164,11 +184,11 @@ def analizar_estacion(estacion, sheet_name, recurso_solar_file, cargas_file):
         print(f"✅ Resoluciones temporales coinciden")
     
     # En lugar de interpolar consumo, vamos a expandir los datos solares
-    horas_expandidas = df_cargas['Hora'].values
+    horas_expandidas = df_cargas['Hora'].to_numpy(dtype=float)
     
     # Interpolar datos solares a resolución de medias horas
-    ghi_expandido = np.interp(horas_expandidas, df_solar['Hora'], df_solar['GHI_W_m2'])
-    gmod_expandido = np.interp(horas_expandidas, df_solar['Hora'], df_solar['Gmod'])
+    ghi_expandido = np.interp(horas_expandidas, hora_solar, ghi_solar)
+    gmod_expandido = np.interp(horas_expandidas, hora_solar, gmod_solar)
     
     print(f"   Datos interpolados: {len(ghi_expandido)} puntos")
     print(f"   GHI interpolado - Max: {ghi_expandido.max():.1f}, Min: {ghi_expandido.min():.1f}")
@@ -182,7 +202,7 @@ def analizar_estacion(estacion, sheet_name, recurso_solar_file, cargas_file):
     })
     
     # Calcular generación PV con resolución expandida
-    df_expandido['Generacion_PV'] = (df_expandido['Gmod'] * area_modulo * eficiencia * num_modulos * PR * ef_inv) #(1 - perdidas))
+    df_expandido['Generacion_PV'] = gmod_expandido * factor_generacion
     
     # Usar consumo original sin interpolar
     df_expandido['Consumo'] = df_hourly['Total_Consumo'].values
@@ -210,25 +230,41 @@ def analizar_estacion(estacion, sheet_name, recurso_solar_file, cargas_file):
     else:
         print(f"✅ Longitudes coinciden: {len(df_expandido)}")
     
-    # 6. CREAR EL GRÁFICO CON TRES PANELES
-    fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 10), sharex=True)
+    # Potencias en kW (kW/m² para irradiancia) como un único bloque numpy
+    potencias_kw = df_expandido[['GHI_W_m2', 'Gmod', 'Generacion_PV', 'Consumo']].to_numpy(dtype=float) / 1000
+    ghi_kw, gmod_kw, generacion_pv_kw, consumo_kw = potencias_kw.T
     
-    # ============= PANEL 1: IRRADIANCIA SOLAR =============
-    # Convertir a kW/m²
-    ghi_kw = df_expandido['GHI_W_m2'] / 1000
-    gmod_kw = df_expandido['Gmod'] / 1000
+    # MÉTODO EXACTO DEL NOTEBOOK PROFESIONAL
+    # Calcular diferencia energética (Generación - Consumo) en kW
+    diferencia_energia_kw = generacion_pv_kw - consumo_kw
+    
+    # Separar en positiva (exceso) y negativa (déficit) sin recorrer dos veces la diferencia
+    energia_disponible_positiva = np.maximum(diferencia_energia_kw, 0.0)
+    energia_disponible_negativa = diferencia_energia_kw - energia_disponible_positiva
+    
+    # Agregar los nuevos cálculos al DataFrame expandido
+    df_expandido['Diferencia_Energia_kW'] = diferencia_energia_kw
+    df_expandido['Exceso_Energia_kW'] = energia_disponible_positiva  
+    df_expandido['Deficit_Energia_kW'] = energia_disponible_negativa
     
     # Calcular energías usando método coherente
-    energia_ghi_total = np.sum(ghi_kw) * 0.5  # kW/m² * 0.5h = kWh/m²
-    energia_gmod_total = np.sum(gmod_kw) * 0.5  # kW/m² * 0.5h = kWh/m²
+    # Sumatoria con factor de 0.5h por intervalo, todas las series en una sola reducción
+    # (nansum: como Series.sum, los valores faltantes no anulan el total)
+    energia_ghi_total, energia_gmod_total, energia_pv_total, _ = np.nansum(potencias_kw, axis=0) * 0.5
+    energia_exceso_total = np.nansum(energia_disponible_positiva) * 0.5  # kW * 0.5h = kWh
+    energia_deficit_total = abs(np.nansum(energia_disponible_negativa)) * 0.5  # kW * 0.5h = kWh
     
-    ax1.plot(df_expandido['Hora'], ghi_kw, 'b-', linewidth=2, 
+    # 6. CREAR EL GRÁFICO CON TRES PANELES
+    fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 10), sharex=True)
+    
+    # ============= PANEL 1: IRRADIANCIA SOLAR =============
+    ax1.plot(horas_expandidas, ghi_kw, 'b-', linewidth=2, 
              label=f'GHI (Total = {energia_ghi_total:.3f} kWh/m²)', color='tab:blue')
-    ax1.fill_between(df_expandido['Hora'], ghi_kw, alpha=0.3, color='tab:blue')
+    ax1.fill_between(horas_expandidas, ghi_kw, alpha=0.3, color='tab:blue')
     
-    ax1.plot(df_expandido['Hora'], gmod_kw, 'g-', linewidth=2,
+    ax1.plot(horas_expandidas, gmod_kw, 'g-', linewidth=2,
              label=f'Gmod (Total = {energia_gmod_total:.3f} kWh/m²)', color='tab:green')
-    ax1.fill_between(df_expandido['Hora'], gmod_kw, alpha=0.3, color='tab:green')
+    ax1.fill_between(horas_expandidas, gmod_kw, alpha=0.3, color='tab:green')
     
     ax1.set_ylabel('GHI y Gmod (kW/m²)', fontsize=16, fontweight='bold')
     ax1.legend(fontsize=14)
@@ -236,12 +272,9 @@ def analizar_estacion(estacion, sheet_name, recurso_solar_file, cargas_file):
     ax1.set_xlim(0, 24)
     
     # ============= PANEL 2: CONSUMO =============
-    # Convertir consumo a kW
-    consumo_kw = df_expandido['Consumo'] / 1000
-    
     # Graficar consumo con líneas normales
-    ax2.plot(df_expandido['Hora'], consumo_kw, color='red', linewidth=2)
-    ax2.fill_between(df_expandido['Hora'], 0, consumo_kw, alpha=0.3, color='red',
+    ax2.plot(horas_expandidas, consumo_kw, color='red', linewidth=2)
+    ax2.fill_between(horas_expandidas, 0, consumo_kw, alpha=0.3, color='red',
                      label=f'Consumo (Total = {energia_consumo_total:.3f} kWh)')
     ax2.set_ylabel('Consumo (kW)', fontsize=16, fontweight='bold')
     ax2.legend(fontsize=14)
@@ -249,48 +282,25 @@ def analizar_estacion(estacion, sheet_name, recurso_solar_file, cargas_file):
     ax2.set_xlim(0, 24)
     
     # ============= PANEL 3: GENERACIÓN VS CONSUMO =============
-    # Convertir generación PV a kW
-    generacion_pv_kw = df_expandido['Generacion_PV'] / 1000
-    
     # Generación Fotovoltaica
-    # Usar método coherente: sumatoria con factor de 0.5h por intervalo
-    energia_pv_total = np.sum(generacion_pv_kw) * 0.5  # kW * 0.5h = kWh
-    ax3.plot(df_expandido['Hora'], generacion_pv_kw, linewidth=2,
+    ax3.plot(horas_expandidas, generacion_pv_kw, linewidth=2,
              label=f'Generación PV (Total = {energia_pv_total:.3f} kWh)', color='tab:purple')
     
     # Consumo con líneas normales
-    ax3.plot(df_expandido['Hora'], consumo_kw, color='tab:red', linewidth=2,
+    ax3.plot(horas_expandidas, consumo_kw, color='tab:red', linewidth=2,
              label=f'Consumo (Total = {energia_consumo_total:.3f} kWh)')
     
-    # MÉTODO EXACTO DEL NOTEBOOK PROFESIONAL
-    # Calcular diferencia energética (Generación - Consumo) en kW
-    diferencia_energia_kw = generacion_pv_kw - consumo_kw
-    
-    # Separar en positiva (exceso) y negativa (déficit)
-    energia_disponible_positiva = diferencia_energia_kw.clip(lower=0)
-    energia_disponible_negativa = diferencia_energia_kw.clip(upper=0)
-    
-    # Agregar los nuevos cálculos al DataFrame expandido
-    df_expandido['Diferencia_Energia_kW'] = diferencia_energia_kw
-    df_expandido['Exceso_Energia_kW'] = energia_disponible_positiva  
-    df_expandido['Deficit_Energia_kW'] = energia_disponible_negativa
-    
     # Graficar la línea de diferencia energética con líneas normales
-    ax3.plot(df_expandido['Hora'], diferencia_energia_kw,
+    ax3.plot(horas_expandidas, diferencia_energia_kw,
              label='Energía Disponible', color='tab:orange', linewidth=2)
     
-    # Calcular áreas usando método coherente
-    # Usar sumatoria con factor de 0.5h por intervalo para ser coherente con el cálculo de consumo
-    energia_exceso_total = np.sum(energia_disponible_positiva) * 0.5  # kW * 0.5h = kWh
-    energia_deficit_total = abs(np.sum(energia_disponible_negativa)) * 0.5  # kW * 0.5h = kWh
-    
     # Rellenar áreas con líneas normales
-    ax3.fill_between(df_expandido['Hora'], 0, diferencia_energia_kw, 
+    ax3.fill_between(horas_expandidas, 0, diferencia_energia_kw, 
                      where=(diferencia_energia_kw >= 0),
                      alpha=0.3, color='green', interpolate=True,
                      label=f'Exceso = {energia_exceso_total:.3f} kWh')
     
-    ax3.fill_between(df_expandido['Hora'], 0, diferencia_energia_kw, 
+    ax3.fill_between(horas_expandidas, 0, diferencia_energia_kw, 
                      where=(diferencia_energia_kw < 0),
                      alpha=0.3, color='red', interpolate=True,
                      label=f'Déficit = {energia_deficit_total:.3f} kWh')
@@ -301,13 +311,10 @@ def analizar_estacion(estacion, sheet_name, recurso_solar_file, cargas_file):
     ax3.grid(True, alpha=0.5)
     ax3.set_xlim(0, 24)
     
-    # Formatear eje x para mostrar horas
-    hora_labels = [f"{int(h):02d}:00" for h in range(0, 25, 2)]
-    hora_ticks = list(range(0, 25, 2))
-    
+    # Formatear eje x para mostrar horas (etiquetas precalculadas a nivel de módulo)
     # Solo aplicar formato al último eje (ax3)
-    ax3.set_xticks(hora_ticks)
-    ax3.set_xticklabels(hora_labels, rotation=45, fontsize=14)
+    ax3.set_xticks(_HORA_TICKS)
+    ax3.set_xticklabels(_HORA_LABELS, rotation=45, fontsize=14)
     
     # Configuración general
     plt.xlabel('Fecha', fontsize=16, fontweight='bold')
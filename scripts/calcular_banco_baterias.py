@@ -2,6 +2,8 @@
 Script para calcular la capacidad del banco de baterías
 basado en días de autonomía y parámetros del sistema.
 """
+import numpy as np
+from numpy.typing import ArrayLike
 
 def calcular_banco_baterias(
     energia_diaria_kwh: float,
@@ -54,6 +56,47 @@ def calcular_banco_baterias(
     }
 
 
+def calcular_banco_baterias_vectorizado(
+    energia_diaria_kwh: ArrayLike,
+    dias_autonomia: ArrayLike,
+    voltaje_sistema: ArrayLike,
+    profundidad_descarga: ArrayLike,
+    voltaje_bateria: ArrayLike,
+    capacidad_bateria_ah: ArrayLike
+) -> np.ndarray:
+    """
+    Versión vectorizada de calcular_banco_baterias para barridos de parámetros.
+    
+    Los argumentos pueden ser escalares o arreglos; se combinan con broadcasting
+    de numpy, de modo que N combinaciones se evalúan sin bucle en Python.
+    
+    Returns:
+        np.ndarray: Arreglo (N, 5) con las columnas
+            [Capacidad Total [Ah], Nº Serie, Nº Paralelo, Total Baterías, Capacidad Real [kWh]].
+            Las columnas de número de baterías se redondean igual que en la versión escalar.
+    """
+    energia_diaria_kwh, dias_autonomia, voltaje_sistema, profundidad_descarga, voltaje_bateria, capacidad_bateria_ah = (
+        np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (
+            energia_diaria_kwh, dias_autonomia, voltaje_sistema,
+            profundidad_descarga, voltaje_bateria, capacidad_bateria_ah
+        )))
+    )
+    
+    capacidad_total_ah = (energia_diaria_kwh * 1000 * dias_autonomia) / (voltaje_sistema * profundidad_descarga)
+    num_serie = voltaje_sistema / voltaje_bateria
+    num_paralelo = capacidad_total_ah / capacidad_bateria_ah
+    total_baterias = num_serie * num_paralelo
+    capacidad_real_kwh = (total_baterias * capacidad_bateria_ah * voltaje_bateria) / 1000
+    
+    return np.column_stack([
+        capacidad_total_ah.ravel(),
+        np.round(num_serie).ravel(),
+        np.round(num_paralelo).ravel(),
+        np.round(total_baterias).ravel(),
+        capacidad_real_kwh.ravel()
+    ])
+
+
 def imprimir_resultados(resultados):
     """
     Imprime los resultados del cálculo de forma legible.
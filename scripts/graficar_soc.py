@@ -1,12 +1,29 @@
 """
 Script para generar gráficos de SOC, generación fotovoltaica y consumo.
+
+En modo batch los gráficos comparten una figura que se reutiliza entre
+llamadas y no se cierra al guardar: quien llame a las funciones graficar_*
+debe llamar a cerrar_figuras() al terminar su lote de gráficos (ver main.py).
+En modo interactivo cada gráfico abre su propia figura.
 """
 
+import os
+import matplotlib
+
+# Modo batch (BATCH=1): backend Agg sin ventanas y sin plt.show()
+_MODO_BATCH = os.environ.get("BATCH") == "1"
+if _MODO_BATCH:
+    matplotlib.use("Agg")
+
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 import pandas as pd
 import numpy as np
 from typing import Optional, Tuple
 
+# Compresión zlib de los PNG (3 guarda más rápido que el 6 por defecto, a cambio de archivos más grandes)
+_OPCIONES_PNG = {"compress_level": 3}
+
 
 def configurar_estilo_graficos():
     """
@@ -19,11 +36,151 @@ def configurar_estilo_graficos():
     plt.rcParams['grid.alpha'] = 0.3
 
 
+_ESTILO_CONFIGURADO = False
+
+
+def _configurar_estilo_una_vez() -> None:
+    """
+    Aplica configurar_estilo_graficos sólo en el primer gráfico del proceso.
+    """
+    global _ESTILO_CONFIGURADO
+    if not _ESTILO_CONFIGURADO:
+        configurar_estilo_graficos()
+        _ESTILO_CONFIGURADO = True
+
+
+# Sobre este número de puntos los marcadores se dibujan sólo cada cierto paso
+_MAX_PUNTOS_CON_MARCADOR = 200
+
+
+def _marcadores(n_puntos: int, marcador: str) -> dict:
+    """
+    Opciones de marcador para ax.plot: todos los puntos en series cortas,
+    y con markevery (~100 marcadores) en series largas.
+    """
+    opciones = {'marker': marcador, 'markersize': 4}
+    if n_puntos > _MAX_PUNTOS_CON_MARCADOR:
+        opciones['markevery'] = max(1, n_puntos // 100)
+    return opciones
+
+
+def _agregar_linea(ax, x: np.ndarray, y: np.ndarray, **kwargs) -> LineCollection:
+    """
+    Dibuja la serie (x, y) como una LineCollection de un solo trazo y
+    reajusta los límites del eje (add_collection no lo hace por sí solo).
+    """
+    linea = LineCollection([np.column_stack([x, y])], **kwargs)
+    ax.add_collection(linea)
+    ax.autoscale_view()
+    return linea
+
+
+def _decimar_m4(x: np.ndarray, y: np.ndarray, max_tramos: int = 1000) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reducción M4 para graficar series largas: por cada tramo se conservan
+    el primer, el último, el mínimo y el máximo punto (la línea se ve igual).
+    
+    Args:
+        x: Eje X
+        y: Valores de la serie
+        max_tramos: Número máximo de tramos (del orden del ancho en píxeles)
+    
+    Returns:
+        tuple: (x_decimado, y_decimado)
+    """
+    n = len(y)
+    if n <= 4 * max_tramos:
+        return x, y
+    
+    # Tramos de igual tamaño; el último se rellena con NaN para poder usar reshape
+    tamano = -(-n // max_tramos)
+    n_tramos = -(-n // tamano)
+    y_tramos = np.full(n_tramos * tamano, np.nan)
+    y_tramos[:n] = y
+    y_tramos = y_tramos.reshape(n_tramos, tamano)
+    
+    base = np.arange(n_tramos) * tamano
+    indices = np.unique(np.concatenate([
+        base,
+        base + np.nanargmin(y_tramos, axis=1),
+        base + np.nanargmax(y_tramos, axis=1),
+        np.minimum(base + tamano, n) - 1
+    ]))
+    
+    return x[indices], y[indices]
+
+
+# Figura compartida entre gráficos en modo batch: se limpia y reutiliza en vez de crear una nueva cada vez
+_FIG = None
+
+
+def _obtener_figura(fig, nrows: int, ncols: int, figsize: Tuple[float, float], sharex: bool = False):
+    """
+    Prepara una figura limpia con la grilla de ejes pedida.
+    
+    Si no se entrega fig, en modo batch reutiliza la figura compartida del
+    módulo (creándola si aún no existe o si ya fue cerrada). En modo interactivo
+    crea una figura nueva, para no borrar una ventana que siga abierta.
+    
+    Returns:
+        tuple: (fig, ejes)
+    """
+    global _FIG
+    if fig is None:
+        if not _MODO_BATCH:
+            fig = plt.figure(figsize=figsize)
+            return fig, fig.subplots(nrows, ncols, sharex=sharex)
+        if _FIG is None or not plt.fignum_exists(_FIG.number):
+            _FIG = plt.figure(figsize=figsize)
+        fig = _FIG
+    fig.clear()
+    fig.set_size_inches(figsize)
+    # fig.clear() conserva los márgenes que dejó tight_layout; se vuelven a los por defecto
+    fig.subplots_adjust(**{clave: plt.rcParams[f'figure.subplot.{clave}']
+                           for clave in ('left', 'bottom', 'right', 'top', 'wspace', 'hspace')})
+    return fig, fig.subplots(nrows, ncols, sharex=sharex)
+
+
+def cerrar_figuras() -> None:
+    """
+    Cierra la figura compartida. Debe llamarse al terminar un lote de gráficos
+    (idealmente en un finally); si no, la figura vive hasta el fin del proceso.
+    """
+    global _FIG
+    if _FIG is not None:
+        plt.close(_FIG)
+        _FIG = None
+
+
+def _mostrar_si_interactivo(fig) -> None:
+    """
+    Muestra la figura en modo interactivo; en modo batch no hace nada y la
+    figura queda abierta para reutilizarla en el siguiente gráfico, por lo que
+    el llamador debe cerrarla con cerrar_figuras() al terminar.
+    """
+    if not _MODO_BATCH:
+        plt.show()
+
+
+def _extraer_arreglos(df: pd.DataFrame) -> Tuple[np.ndarray, ...]:
+    """
+    Extrae una sola vez las columnas de la simulación como arreglos de numpy.
+    
+    Returns:
+        tuple: (hora, generacion, consumo, soc, balance)
+    """
+    return tuple(
+        df[col].to_numpy()
+        for col in ('Hora', 'Generacion_PV', 'Consumo', 'SOC', 'Balance_Energetico')
+    )
+
+
 def graficar_soc_diario(
     df: pd.DataFrame,
     titulo: str = "Simulación SOC Diario",
     guardar: bool = True,
-    nombre_archivo: str = "soc_diario.png"
+    nombre_archivo: str = "soc_diario.png",
+    fig: Optional[plt.Figure] = None
 ) -> None:
     """
     Genera un gráfico del SOC diario con generación y consumo.
@@ -33,22 +190,26 @@ def graficar_soc_diario(
         titulo: Título del gráfico
         guardar: Si guardar el gráfico como archivo
         nombre_archivo: Nombre del archivo a guardar
+        fig: Figura a reutilizar (si es None se usa la figura compartida del módulo)
     """
     
-    configurar_estilo_graficos()
+    _configurar_estilo_una_vez()
+    
+    hora, generacion, consumo, soc, _ = _extraer_arreglos(df)
     
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10), sharex=True)
+    fig, (ax1, ax2) = _obtener_figura(fig, 2, 1, figsize=(14, 10), sharex=True)
     
     # Gráfico superior: Generación y Consumo
-    ax1.plot(df['Hora'], df['Generacion_PV'], 
-             label='Generación FV', color='orange', linewidth=2, marker='o', markersize=4)
-    ax1.plot(df['Hora'], df['Consumo'], 
-             label='Consumo', color='red', linewidth=2, marker='s', markersize=4)
-    ax1.fill_between(df['Hora'], df['Generacion_PV'], df['Consumo'], 
-                     where=(df['Generacion_PV'] > df['Consumo']), 
+    ax1.plot(hora, generacion, 
+             label='Generación FV', color='orange', linewidth=2, **_marcadores(len(hora), 'o'))
+    ax1.plot(hora, consumo, 
+             label='Consumo', color='red', linewidth=2, **_marcadores(len(hora), 's'))
+    exceso = generacion > consumo  # máscara calculada una sola vez para ambos rellenos
+    ax1.fill_between(hora, generacion, consumo, 
+                     where=exceso, interpolate=False, 
                      alpha=0.3, color='green', label='Exceso')
-    ax1.fill_between(df['Hora'], df['Generacion_PV'], df['Consumo'], 
-                     where=(df['Generacion_PV'] < df['Consumo']), 
+    ax1.fill_between(hora, generacion, consumo, 
+                     where=~exceso, interpolate=False, 
                      alpha=0.3, color='red', label='Déficit')
     
     ax1.set_ylabel('Potencia (W)')
@@ -57,8 +218,8 @@ def graficar_soc_diario(
     ax1.grid(True, alpha=0.3)
     
     # Gráfico inferior: SOC
-    ax2.plot(df['Hora'], df['SOC'], 
-             label='SOC', color='blue', linewidth=2, marker='o', markersize=4)
+    ax2.plot(hora, soc, 
+             label='SOC', color='blue', linewidth=2, **_marcadores(len(hora), 'o'))
     ax2.axhline(y=0.2, color='red', linestyle='--', alpha=0.7, label='SOC Mínimo (20%)')
     ax2.axhline(y=0.3, color='orange', linestyle='--', alpha=0.7, label='SOC Crítico (30%)')
     ax2.axhline(y=1.0, color='green', linestyle='--', alpha=0.7, label='SOC Máximo (100%)')
@@ -70,20 +231,21 @@ def graficar_soc_diario(
     ax2.grid(True, alpha=0.3)
     ax2.set_ylim(0, 1.1)
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     if guardar:
-        plt.savefig(nombre_archivo, dpi=300, bbox_inches='tight')
+        fig.savefig(nombre_archivo, dpi=300, pil_kwargs=_OPCIONES_PNG)
         print(f"Gráfico guardado como: {nombre_archivo}")
     
-    plt.show()
+    _mostrar_si_interactivo(fig)
 
 
 def graficar_soc_multiple_dias(
     df: pd.DataFrame,
     titulo: str = "Simulación SOC Múltiples Días",
     guardar: bool = True,
-    nombre_archivo: str = "soc_multiple_dias.png"
+    nombre_archivo: str = "soc_multiple_dias.png",
+    fig: Optional[plt.Figure] = None
 ) -> None:
     """
     Genera un gráfico del SOC para múltiples días.
@@ -93,17 +255,19 @@ def graficar_soc_multiple_dias(
         titulo: Título del gráfico
         guardar: Si guardar el gráfico como archivo
         nombre_archivo: Nombre del archivo a guardar
+        fig: Figura a reutilizar (si es None se usa la figura compartida del módulo)
     """
     
-    configurar_estilo_graficos()
+    _configurar_estilo_una_vez()
     
-    fig, ax = plt.subplots(figsize=(16, 8))
+    fig, ax = _obtener_figura(fig, 1, 1, figsize=(16, 8))
     
     # Crear eje X numérico para mejor visualización
-    horas_numericas = range(len(df))
+    soc = df['SOC'].to_numpy()
+    horas_numericas = np.arange(len(soc))
     
-    # Gráfico de SOC
-    ax.plot(horas_numericas, df['SOC'], 
+    # Gráfico de SOC (series muy largas se reducen con M4 antes de dibujar)
+    ax.plot(*_decimar_m4(horas_numericas, soc), 
             label='SOC', color='blue', linewidth=1.5, alpha=0.8)
     
     # Líneas de referencia
@@ -126,20 +290,21 @@ def graficar_soc_multiple_dias(
     ax.grid(True, alpha=0.3)
     ax.set_ylim(0, 1.1)
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     if guardar:
-        plt.savefig(nombre_archivo, dpi=300, bbox_inches='tight')
+        fig.savefig(nombre_archivo, dpi=300, pil_kwargs=_OPCIONES_PNG)
         print(f"Gráfico guardado como: {nombre_archivo}")
     
-    plt.show()
+    _mostrar_si_interactivo(fig)
 
 
 def graficar_comparacion_estaciones(
     df_invierno: pd.DataFrame,
     df_verano: pd.DataFrame,
     guardar: bool = True,
-    nombre_archivo: str = "comparacion_estaciones.png"
+    nombre_archivo: str = "comparacion_estaciones.png",
+    fig: Optional[plt.Figure] = None
 ) -> None:
     """
     Genera un gráfico comparativo entre invierno y verano.
@@ -149,17 +314,20 @@ def graficar_comparacion_estaciones(
         df_verano: DataFrame con datos de verano
         guardar: Si guardar el gráfico como archivo
         nombre_archivo: Nombre del archivo a guardar
+        fig: Figura a reutilizar (si es None se usa la figura compartida del módulo)
     """
     
-    configurar_estilo_graficos()
+    _configurar_estilo_una_vez()
     
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10), sharex=True)
+    hora_inv, generacion_inv, consumo_inv, soc_inv, _ = _extraer_arreglos(df_invierno)
+    hora_ver, generacion_ver, _, soc_ver, _ = _extraer_arreglos(df_verano)
+    
+    fig, (ax1, ax2) = _obtener_figura(fig, 2, 1, figsize=(14, 10), sharex=True)
     
     # Gráfico superior: SOC comparativo
-    ax1.plot(df_invierno['Hora'], df_invierno['SOC'], 
-             label='Invierno', color='blue', linewidth=2, marker='o', markersize=4)
-    ax1.plot(df_verano['Hora'], df_verano['SOC'], 
-             label='Verano', color='orange', linewidth=2, marker='s', markersize=4)
+    # Series superpuestas como LineCollection, sin marcadores por punto
+    _agregar_linea(ax1, hora_inv, soc_inv, label='Invierno', colors='blue', linewidths=2)
+    _agregar_linea(ax1, hora_ver, soc_ver, label='Verano', colors='orange', linewidths=2)
     ax1.axhline(y=0.2, color='red', linestyle='--', alpha=0.7, label='SOC Mínimo (20%)')
     
     ax1.set_ylabel('SOC (State of Charge)')
@@ -169,11 +337,9 @@ def graficar_comparacion_estaciones(
     ax1.set_ylim(0, 1.1)
     
     # Gráfico inferior: Generación comparativa
-    ax2.plot(df_invierno['Hora'], df_invierno['Generacion_PV'], 
-             label='Generación Invierno', color='lightblue', linewidth=2, marker='o', markersize=4)
-    ax2.plot(df_verano['Hora'], df_verano['Generacion_PV'], 
-             label='Generación Verano', color='gold', linewidth=2, marker='s', markersize=4)
-    ax2.plot(df_invierno['Hora'], df_invierno['Consumo'], 
+    _agregar_linea(ax2, hora_inv, generacion_inv, label='Generación Invierno', colors='lightblue', linewidths=2)
+    _agregar_linea(ax2, hora_ver, generacion_ver, label='Generación Verano', colors='gold', linewidths=2)
+    ax2.plot(hora_inv, consumo_inv, 
              label='Consumo', color='red', linewidth=2, linestyle='--', alpha=0.7)
     
     ax2.set_ylabel('Potencia (W)')
@@ -182,20 +348,21 @@ def graficar_comparacion_estaciones(
     ax2.legend()
     ax2.grid(True, alpha=0.3)
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     if guardar:
-        plt.savefig(nombre_archivo, dpi=300, bbox_inches='tight')
+        fig.savefig(nombre_archivo, dpi=300, pil_kwargs=_OPCIONES_PNG)
         print(f"Gráfico guardado como: {nombre_archivo}")
     
-    plt.show()
+    _mostrar_si_interactivo(fig)
 
 
 def graficar_balance_energetico(
     df: pd.DataFrame,
     titulo: str = "Balance Energético",
     guardar: bool = True,
-    nombre_archivo: str = "balance_energetico.png"
+    nombre_archivo: str = "balance_energetico.png",
+    fig: Optional[plt.Figure] = None
 ) -> None:
     """
     Genera un gráfico del balance energético.
@@ -205,23 +372,27 @@ def graficar_balance_energetico(
         titulo: Título del gráfico
         guardar: Si guardar el gráfico como archivo
         nombre_archivo: Nombre del archivo a guardar
+        fig: Figura a reutilizar (si es None se usa la figura compartida del módulo)
     """
     
-    configurar_estilo_graficos()
+    _configurar_estilo_una_vez()
+    
+    hora, _, _, _, balance = _extraer_arreglos(df)
     
-    fig, ax = plt.subplots(figsize=(14, 8))
+    fig, ax = _obtener_figura(fig, 1, 1, figsize=(14, 8))
     
     # Gráfico de balance energético
-    ax.plot(df['Hora'], df['Balance_Energetico'], 
-            label='Balance Energético', color='purple', linewidth=2, marker='o', markersize=4)
+    ax.plot(hora, balance, 
+            label='Balance Energético', color='purple', linewidth=2, **_marcadores(len(hora), 'o'))
     ax.axhline(y=0, color='black', linestyle='-', alpha=0.5)
     
     # Rellenar áreas
-    ax.fill_between(df['Hora'], df['Balance_Energetico'], 0, 
-                    where=(df['Balance_Energetico'] > 0), 
+    exceso = balance > 0  # máscara calculada una sola vez para ambos rellenos
+    ax.fill_between(hora, balance, 0, 
+                    where=exceso, interpolate=False, 
                     alpha=0.3, color='green', label='Exceso (Carga)')
-    ax.fill_between(df['Hora'], df['Balance_Energetico'], 0, 
-                    where=(df['Balance_Energetico'] < 0), 
+    ax.fill_between(hora, balance, 0, 
+                    where=~exceso, interpolate=False, 
                     alpha=0.3, color='red', label='Déficit (Descarga)')
     
     ax.set_ylabel('Balance Energético (W)')
@@ -230,13 +401,29 @@ def graficar_balance_energetico(
     ax.legend()
     ax.grid(True, alpha=0.3)
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     if guardar:
-        plt.savefig(nombre_archivo, dpi=300, bbox_inches='tight')
+        fig.savefig(nombre_archivo, dpi=300, pil_kwargs=_OPCIONES_PNG)
         print(f"Gráfico guardado como: {nombre_archivo}")
     
-    plt.show()
+    _mostrar_si_interactivo(fig)
+
+
+def _estadisticas_soc(df: pd.DataFrame) -> dict:
+    """
+    Calcula las estadísticas del resumen sobre los arreglos de numpy de la simulación.
+    """
+    soc = df['SOC'].to_numpy()
+    energias = df[['Energia_Cargada', 'Energia_Descargada']].to_numpy().sum(axis=0) / 1000
+    return {
+        'SOC_Minimo': soc.min(),
+        'SOC_Maximo': soc.max(),
+        'SOC_Promedio': soc.mean(),
+        'Energia_Cargada_kWh': energias[0],
+        'Energia_Descargada_kWh': energias[1],
+        'Horas_Criticas': int((soc < 0.3).sum())
+    }
 
 
 def crear_resumen_estadisticas(
@@ -256,23 +443,8 @@ def crear_resumen_estadisticas(
     """
     
     # Calcular estadísticas
-    stats_invierno = {
-        'SOC_Minimo': df_invierno['SOC'].min(),
-        'SOC_Maximo': df_invierno['SOC'].max(),
-        'SOC_Promedio': df_invierno['SOC'].mean(),
-        'Energia_Cargada_kWh': df_invierno['Energia_Cargada'].sum() / 1000,
-        'Energia_Descargada_kWh': df_invierno['Energia_Descargada'].sum() / 1000,
-        'Horas_Criticas': len(df_invierno[df_invierno['SOC'] < 0.3])
-    }
-    
-    stats_verano = {
-        'SOC_Minimo': df_verano['SOC'].min(),
-        'SOC_Maximo': df_verano['SOC'].max(),
-        'SOC_Promedio': df_verano['SOC'].mean(),
-        'Energia_Cargada_kWh': df_verano['Energia_Cargada'].sum() / 1000,
-        'Energia_Descargada_kWh': df_verano['Energia_Descargada'].sum() / 1000,
-        'Horas_Criticas': len(df_verano[df_verano['SOC'] < 0.3])
-    }
+    stats_invierno = _estadisticas_soc(df_invierno)
+    stats_verano = _estadisticas_soc(df_verano)
     
     # Crear texto del resumen
     resumen = f"""
@@ -5,7 +5,109 @@ para diferentes períodos y condiciones.
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba es opcional: sin él el kernel corre en Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda funcion: funcion
+    
+    prange = range
+
+
+@njit(cache=True)
+def _soc_kernel(generacion, consumo, capacidad, energia_inicial, energia_minima,
+                eficiencia_carga, eficiencia_descarga):
+    """
+    Simula paso a paso el balance, la energía cargada/descargada y la energía
+    de la batería, limitada entre energia_minima y capacidad, en una sola pasada.
+    
+    Returns:
+        Tupla (balance, energia_cargada, energia_descargada, energia_bateria)
+        de np.ndarray con el tipo numérico de generacion
+    """
+    n = generacion.shape[0]
+    balance = np.empty(n, dtype=generacion.dtype)
+    energia_cargada = np.empty(n, dtype=generacion.dtype)
+    energia_descargada = np.empty(n, dtype=generacion.dtype)
+    energia_bateria = np.empty(n, dtype=generacion.dtype)
+    energia = energia_inicial
+    for i in range(n):
+        b = generacion[i] - consumo[i]
+        balance[i] = b
+        if b > 0:
+            # Exceso - cargar
+            energia_cargada[i] = b * eficiencia_carga
+            energia_descargada[i] = 0.0
+        else:
+            # Déficit - descargar
+            energia_cargada[i] = 0.0
+            energia_descargada[i] = -b / eficiencia_descarga
+        energia = energia + (energia_cargada[i] - energia_descargada[i])
+        if energia > capacidad:
+            energia = capacidad
+        if energia < energia_minima:
+            energia = energia_minima
+        energia_bateria[i] = energia
+    return balance, energia_cargada, energia_descargada, energia_bateria
+
+
+@njit(cache=True, parallel=True)
+def _soc_kernel_lote(generacion, consumo, capacidad, energia_inicial, energia_minima,
+                     eficiencia_carga, eficiencia_descarga):
+    """
+    Aplica _soc_kernel a cada fila de generacion/consumo (forma (S, N)), con
+    capacidad y límites de energía propios de cada fila (forma (S,)).
+    
+    Returns:
+        np.ndarray de forma (4, S, N) con balance, energía cargada, energía
+        descargada y energía de la batería de cada fila
+    """
+    filas, n = generacion.shape
+    salida = np.empty((4, filas, n), dtype=generacion.dtype)
+    for k in prange(filas):
+        balance, energia_cargada, energia_descargada, energia_bateria = _soc_kernel(
+            generacion[k], consumo[k], capacidad[k], energia_inicial[k], energia_minima[k],
+            eficiencia_carga, eficiencia_descarga
+        )
+        salida[0, k] = balance
+        salida[1, k] = energia_cargada
+        salida[2, k] = energia_descargada
+        salida[3, k] = energia_bateria
+    return salida
+
+
+def _resultados_soc(horas, generacion, consumo, balance, energia_cargada,
+                    energia_descargada, energia_bateria, capacidad_almacenamiento_wh) -> pd.DataFrame:
+    """
+    Arma el DataFrame de resultados de una simulación de SOC con sus estadísticas en attrs.
+    """
+    
+    # Calcular SOC
+    soc = energia_bateria / capacidad_almacenamiento_wh
+    
+    # Crear DataFrame de resultados
+    resultados = pd.DataFrame({
+        'Hora': horas,
+        'Generacion_PV': generacion,
+        'Consumo': consumo,
+        'Balance_Energetico': balance,
+        'Energia_Bateria_Wh': energia_bateria,
+        'SOC': soc,
+        'Energia_Cargada': energia_cargada,
+        'Energia_Descargada': energia_descargada
+    })
+    
+    # Agregar estadísticas
+    resultados.attrs['energia_cargada_total_kwh'] = energia_cargada.sum() / 1000
+    resultados.attrs['energia_descargada_total_kwh'] = energia_descargada.sum() / 1000
+    resultados.attrs['soc_minimo_alcanzado'] = soc.min()
+    resultados.attrs['soc_maximo_alcanzado'] = soc.max()
+    
+    return resultados
 
 
 def simular_soc_diario(
@@ -15,96 +117,128 @@ def simular_soc_diario(
     soc_inicial: float = 1.0,
     soc_minimo: float = 0.2,
     eficiencia_carga: float = 0.9,
-    eficiencia_descarga: float = 0.9
+    eficiencia_descarga: float = 0.9,
+    dtype: Optional[np.dtype] = None
 ) -> pd.DataFrame:
     """
     Simula el SOC para un día completo.
     
     Args:
-        generacion_df: DataFrame con datos de generación fotovoltaica
-        demanda_df: DataFrame con datos de demanda/consumo
+        generacion_df: DataFrame, Serie o np.ndarray con datos de generación fotovoltaica
+        demanda_df: DataFrame, Serie o np.ndarray con datos de demanda/consumo
         capacidad_almacenamiento_wh: Capacidad del banco en Wh
         soc_inicial: SOC inicial (0.0 a 1.0)
         soc_minimo: SOC mínimo permitido (0.0 a 1.0)
         eficiencia_carga: Eficiencia de carga (0.0 a 1.0)
         eficiencia_descarga: Eficiencia de descarga (0.0 a 1.0)
+        dtype: Tipo numérico de la simulación (p. ej. np.float32 para series largas);
+            si es None se conservan los datos de entrada y la recursión usa float64
     
     Returns:
         DataFrame con los resultados de la simulación
     """
     
-    # Inicializar listas para almacenar resultados
-    horas = []
-    soc_list = []
-    energia_bateria_list = []
-    generacion_list = []
-    consumo_list = []
-    balance_energetico_list = []
-    energia_cargada_list = []
-    energia_descargada_list = []
-    
-    # Estado inicial
-    energia_bateria = soc_inicial * capacidad_almacenamiento_wh
-    energia_cargada_total = 0.0
-    energia_descargada_total = 0.0
-    
-    # Simular cada hora
-    for i in range(len(generacion_df)):
-        hora = generacion_df.index[i] if hasattr(generacion_df.index[i], 'hour') else i
-        generacion = generacion_df.iloc[i] if isinstance(generacion_df, pd.Series) else generacion_df.iloc[i, 0]
-        consumo = demanda_df.iloc[i] if isinstance(demanda_df, pd.Series) else demanda_df.iloc[i, 0]
-        
-        # Balance energético
-        balance = generacion - consumo
-        
-        # Calcular energía que entra/sale de la batería
-        if balance > 0:  # Exceso de generación - cargar batería
-            energia_cargada = balance * eficiencia_carga
-            energia_bateria += energia_cargada
-            energia_cargada_total += energia_cargada
-            energia_descargada = 0.0
-        else:  # Déficit - descargar batería
-            energia_descargada = abs(balance) / eficiencia_descarga
-            energia_bateria -= energia_descargada
-            energia_descargada_total += energia_descargada
-            energia_cargada = 0.0
-        
-        # Limitar la energía de la batería
-        energia_bateria = max(soc_minimo * capacidad_almacenamiento_wh, 
-                            min(capacidad_almacenamiento_wh, energia_bateria))
-        
-        # Calcular SOC
-        soc = energia_bateria / capacidad_almacenamiento_wh
-        
-        # Almacenar resultados
-        horas.append(hora)
-        soc_list.append(soc)
-        energia_bateria_list.append(energia_bateria)
-        generacion_list.append(generacion)
-        consumo_list.append(consumo)
-        balance_energetico_list.append(balance)
-        energia_cargada_list.append(energia_cargada)
-        energia_descargada_list.append(energia_descargada)
+    # Extraer series como arreglos (si es DataFrame se usa la primera columna;
+    # los np.ndarray se usan sin copia)
+    generacion = np.asarray(generacion_df, dtype=dtype)
+    consumo = np.asarray(demanda_df, dtype=dtype)
+    if generacion.ndim > 1:
+        generacion = generacion[:, 0]
+    if consumo.ndim > 1:
+        consumo = consumo[:, 0]
     
-    # Crear DataFrame de resultados
-    resultados = pd.DataFrame({
-        'Hora': horas,
-        'Generacion_PV': generacion_list,
-        'Consumo': consumo_list,
-        'Balance_Energetico': balance_energetico_list,
-        'Energia_Bateria_Wh': energia_bateria_list,
-        'SOC': soc_list,
-        'Energia_Cargada': energia_cargada_list,
-        'Energia_Descargada': energia_descargada_list
-    })
+    # Eje de tiempo: el índice si es de fechas, si no la posición
+    n = len(generacion)
+    indice = getattr(generacion_df, 'index', None)
+    if indice is not None and n > 0 and hasattr(indice[0], 'hour'):
+        horas = indice.to_numpy()
+    else:
+        horas = np.arange(n)
     
-    # Agregar estadísticas
-    resultados.attrs['energia_cargada_total_kwh'] = energia_cargada_total / 1000
-    resultados.attrs['energia_descargada_total_kwh'] = energia_descargada_total / 1000
-    resultados.attrs['soc_minimo_alcanzado'] = min(soc_list)
-    resultados.attrs['soc_maximo_alcanzado'] = max(soc_list)
+    # Balance energético, energía que entra/sale de la batería y recursión del
+    # estado de carga (limitada entre el SOC mínimo y la capacidad) en un solo kernel
+    tipo = np.dtype(dtype or np.float64)
+    escalar = tipo.type
+    balance, energia_cargada, energia_descargada, energia_bateria = _soc_kernel(
+        generacion.astype(tipo, copy=False),
+        consumo.astype(tipo, copy=False),
+        escalar(capacidad_almacenamiento_wh),
+        escalar(soc_inicial * capacidad_almacenamiento_wh),
+        escalar(soc_minimo * capacidad_almacenamiento_wh),
+        eficiencia_carga,
+        eficiencia_descarga
+    )
     
-    return resultados
+    return _resultados_soc(
+        horas, generacion, consumo, balance, energia_cargada,
+        energia_descargada, energia_bateria, capacidad_almacenamiento_wh
+    )
+
+
+def simular_soc_lote(
+    generacion: np.ndarray,
+    consumo: np.ndarray,
+    capacidad_almacenamiento_wh,
+    soc_inicial: float = 1.0,
+    soc_minimo: float = 0.2,
+    eficiencia_carga: float = 0.9,
+    eficiencia_descarga: float = 0.9,
+    dtype: Optional[np.dtype] = None
+) -> List[pd.DataFrame]:
+    """
+    Simula el SOC de varias series diarias (p. ej. invierno y verano) con una
+    sola llamada al kernel.
+    
+    Args:
+        generacion: Arreglo (S, N) con la generación fotovoltaica de cada serie
+        consumo: Arreglo (S, N) con el consumo de cada serie
+        capacidad_almacenamiento_wh: Capacidad del banco en Wh, común o un valor por serie
+        soc_inicial: SOC inicial (0.0 a 1.0)
+        soc_minimo: SOC mínimo permitido (0.0 a 1.0)
+        eficiencia_carga: Eficiencia de carga (0.0 a 1.0)
+        eficiencia_descarga: Eficiencia de descarga (0.0 a 1.0)
+        dtype: Tipo numérico de la simulación; si es None se usa float64
+    
+    Returns:
+        Lista con un DataFrame por serie, igual al que devuelve simular_soc_diario
+    """
+    
+    generacion = np.asarray(generacion)
+    consumo = np.asarray(consumo)
+    tipo = np.dtype(dtype or np.float64)
+    filas, n = generacion.shape
+    capacidad = np.broadcast_to(np.asarray(capacidad_almacenamiento_wh, dtype=tipo), (filas,))
+    
+    salida = _soc_kernel_lote(
+        generacion.astype(tipo, copy=False),
+        consumo.astype(tipo, copy=False),
+        np.ascontiguousarray(capacidad),
+        (soc_inicial * capacidad).astype(tipo),
+        (soc_minimo * capacidad).astype(tipo),
+        eficiencia_carga,
+        eficiencia_descarga
+    )
+    
+    horas = np.arange(n)
+    return [
+        _resultados_soc(
+            horas, generacion[k], consumo[k], salida[0, k], salida[1, k],
+            salida[2, k], salida[3, k], capacidad[k]
+        )
+        for k in range(filas)
+    ]
+
+
+def _repetir_dias(datos, num_dias: int, indice: pd.Index):
+    """
+    Repite num_dias veces los datos de un día con np.tile sobre el arreglo
+    subyacente y construye la Serie/DataFrame resultante (ya con su índice) una sola vez.
+    """
+    valores = datos.to_numpy()
+    valores = np.tile(valores, (num_dias,) + (1,) * (valores.ndim - 1))
+    if isinstance(datos, pd.Series):
+        return pd.Series(valores, index=indice, name=datos.name)
+    return pd.DataFrame(valores, index=indice, columns=datos.columns)
 
 
 def simular_soc_multiple_dias(
@@ -115,7 +249,8 @@ def simular_soc_multiple_dias(
     soc_inicial: float = 1.0,
     soc_minimo: float = 0.2,
     eficiencia_carga: float = 0.9,
-    eficiencia_descarga: float = 0.9
+    eficiencia_descarga: float = 0.9,
+    dtype: Optional[np.dtype] = None
 ) -> pd.DataFrame:
     """
     Simula el SOC para múltiples días consecutivos.
@@ -129,24 +264,22 @@ def simular_soc_multiple_dias(
         soc_minimo: SOC mínimo permitido (0.0 a 1.0)
         eficiencia_carga: Eficiencia de carga (0.0 a 1.0)
         eficiencia_descarga: Eficiencia de descarga (0.0 a 1.0)
+        dtype: Tipo numérico de la simulación (p. ej. np.float32 para series largas);
+            si es None se conservan los datos de entrada y la recursión usa float64
     
     Returns:
         DataFrame con los resultados de la simulación multi-día
     """
     
-    # Repetir los datos para múltiples días
-    generacion_multi = pd.concat([generacion_df] * num_dias, ignore_index=True)
-    demanda_multi = pd.concat([demanda_df] * num_dias, ignore_index=True)
-    
-    # Crear índice de tiempo para múltiples días
+    # Crear índice de tiempo para múltiples días ("Día d, Hora h")
     horas_por_dia = len(generacion_df)
-    tiempo_total = []
-    for dia in range(num_dias):
-        for hora in range(horas_por_dia):
-            tiempo_total.append(f"Día {dia+1}, Hora {hora}")
+    dias = np.repeat(np.arange(1, num_dias + 1), horas_por_dia)
+    horas = np.tile(np.arange(horas_por_dia), num_dias)
+    tiempo_total = pd.Index([f"Día {d}, Hora {h}" for d, h in zip(dias.tolist(), horas.tolist())])
     
-    generacion_multi.index = tiempo_total
-    demanda_multi.index = tiempo_total
+    # Repetir los datos para múltiples días
+    generacion_multi = _repetir_dias(generacion_df, num_dias, tiempo_total)
+    demanda_multi = _repetir_dias(demanda_df, num_dias, tiempo_total)
     
     # Simular SOC
     resultados = simular_soc_diario(
@@ -156,7 +289,8 @@ def simular_soc_multiple_dias(
         soc_inicial,
         soc_minimo,
         eficiencia_carga,
-        eficiencia_descarga
+        eficiencia_descarga,
+        dtype
     )
     
     resultados.index = tiempo_total
@@ -175,17 +309,18 @@ def analizar_resultados_soc(df: pd.DataFrame) -> Dict:
         Dict con estadísticas del análisis
     """
     
-    # Estadísticas básicas
-    soc_min = df['SOC'].min()
-    soc_max = df['SOC'].max()
-    soc_promedio = df['SOC'].mean()
+    # Estadísticas básicas (reducciones de NumPy sobre los arreglos de las columnas)
+    soc = df['SOC'].to_numpy()
+    soc_min = soc.min()
+    soc_max = soc.max()
+    soc_promedio = soc.mean()
     
     # Horas con SOC crítico (menor al 30%)
-    horas_criticas = len(df[df['SOC'] < 0.3])
+    horas_criticas = int(np.count_nonzero(soc < 0.3))
     
     # Energía total
-    energia_cargada_total = df['Energia_Cargada'].sum() / 1000  # kWh
-    energia_descargada_total = df['Energia_Descargada'].sum() / 1000  # kWh
+    energia_cargada_total = df['Energia_Cargada'].to_numpy().sum() / 1000  # kWh
+    energia_descargada_total = df['Energia_Descargada'].to_numpy().sum() / 1000  # kWh
     
     # Eficiencia del sistema
     eficiencia_sistema = (energia_descargada_total / energia_cargada_total) if energia_cargada_total > 0 else 0
@@ -5,6 +5,7 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 from OFFGRID.scripts.calcular_banco_baterias import calcular_banco_baterias, imprimir_resultados
+from OFFGRID.scripts.utilidades import leer_excel_cacheado, trapecio_uniforme
 
 # ================== PARÁMETROS EDITABLES ==================
 # Archivos de entrada
@@ -32,30 +33,36 @@ OUTPUT_TXT = "OFFGRID/results/resumen_sistema_integrado.txt"
 # ================== PROCESAMIENTO ==================
 # 1. Cargar datos
 print("Cargando datos de recurso solar y demanda...")
-df_solar = pd.read_excel(RECURSO_SOLAR_FILE, sheet_name=SHEET_NAME)
+df_solar = leer_excel_cacheado(RECURSO_SOLAR_FILE, sheet_name=SHEET_NAME)
 df_solar['Fecha_Hora'] = pd.to_datetime(df_solar['Fecha_Hora'])
-df_cargas = pd.read_excel(CARGAS_FILE, header=0)
+df_cargas = leer_excel_cacheado(CARGAS_FILE)
 carga_cols = [c for c in df_cargas.columns if c.lower() != "hora"]
 df_cargas["Hour"] = df_cargas["Hora"].astype(float)
-df_cargas["Total_Consumo"] = df_cargas[carga_cols].sum(axis=1)
+df_cargas["Total_Consumo"] = np.nansum(df_cargas[carga_cols].to_numpy(dtype=np.float64), axis=1)  # celdas vacías cuentan como 0
 df_hourly = df_cargas.set_index("Hour")[["Total_Consumo"]]
 
 # 2. Calcular generación FV
 num_modulos = capacidad_max / Pmax
 # Expandir datos solares a resolución de carga
-horas_expandidas = df_cargas['Hora'].values
-gmod_expandido = np.interp(horas_expandidas, df_solar['Hora'], df_solar['Gmod'])
+# Factor de conversión Gmod (W/m²) → potencia FV (W), calculado una sola vez
+factor_generacion = area_modulo * eficiencia * num_modulos * (1.0 - perdidas)
+horas_expandidas = df_cargas['Hora'].to_numpy()
+gmod_expandido = np.interp(horas_expandidas, df_solar['Hora'].to_numpy(), df_solar['Gmod'].to_numpy())
+generacion_pv = gmod_expandido * factor_generacion
+consumo = df_hourly['Total_Consumo'].to_numpy()
+# Todas las columnas se calculan como arreglos y el DataFrame se construye una sola vez
 df_expandido = pd.DataFrame({
     'Hora': horas_expandidas,
-    'Gmod': gmod_expandido
+    'Gmod': gmod_expandido,
+    'Generacion_PV': generacion_pv,
+    'Consumo': consumo
 })
-df_expandido['Generacion_PV'] = (df_expandido['Gmod'] * area_modulo * eficiencia * num_modulos * (1 - perdidas))
-df_expandido['Consumo'] = df_hourly['Total_Consumo'].values
 
 # 3. Cálculo de déficit diario
-diferencia_energia = df_expandido['Generacion_PV'] - df_expandido['Consumo']
-deficit = diferencia_energia.clip(upper=0)
-deficit_diario_kwh = abs(np.trapz(deficit, df_expandido['Hora'])/1000)
+# Integración sin np.trapz; trapecio_uniforme exige la columna Hora equiespaciada
+# Déficit como potencia positiva (consumo no cubierto por la generación FV)
+deficit = np.clip(consumo - generacion_pv, 0.0, None)
+deficit_diario_kwh = trapecio_uniforme(deficit, horas_expandidas)/1000
 
 # 4. Cálculo del banco de baterías
 resultados_bateria = calcular_banco_baterias(
@@ -68,22 +75,25 @@ resultados_bateria = calcular_banco_baterias(
 )
 
 # 5. Imprimir y guardar resumen
-import sys
-from io import StringIO
+consumo_total_kwh = trapecio_uniforme(df_expandido['Consumo'].to_numpy(), horas_expandidas)/1000
+generacion_total_kwh = trapecio_uniforme(df_expandido['Generacion_PV'].to_numpy(), horas_expandidas)/1000
 
-resumen = StringIO()
-print("="*70, file=resumen)
-print("RESUMEN DEL SISTEMA INTEGRADO", file=resumen)
-print("="*70, file=resumen)
-print(f"Consumo total diario: {np.trapz(df_expandido['Consumo'], df_expandido['Hora'])/1000:.2f} kWh", file=resumen)
-print(f"Generación FV total diaria: {np.trapz(df_expandido['Generacion_PV'], df_expandido['Hora'])/1000:.2f} kWh", file=resumen)
-print(f"Déficit diario (energía requerida para baterías): {deficit_diario_kwh:.2f} kWh", file=resumen)
-print("-"*70, file=resumen)
+# El detalle del banco de baterías se imprime directamente en consola
 imprimir_resultados(resultados_bateria)
-print("="*70, file=resumen)
+
+resumen = (
+    f"{'='*70}\n"
+    f"RESUMEN DEL SISTEMA INTEGRADO\n"
+    f"{'='*70}\n"
+    f"Consumo total diario: {consumo_total_kwh:.2f} kWh\n"
+    f"Generación FV total diaria: {generacion_total_kwh:.2f} kWh\n"
+    f"Déficit diario (energía requerida para baterías): {deficit_diario_kwh:.2f} kWh\n"
+    f"{'-'*70}\n"
+    f"{'='*70}\n"
+)
 
 # Mostrar en consola
-print(resumen.getvalue())
+print(resumen)
 # Guardar en archivo
 with open(OUTPUT_TXT, "w") as f:
-    f.write(resumen.getvalue()) 
\ No newline at end of file
+    f.write(resumen)
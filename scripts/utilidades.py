@@ -0,0 +1,81 @@
+"""
+Utilidades compartidas de lectura de datos e integración numérica para los scripts
+del proyecto (perfil_demanda/recurso_consumo.py y scripts/sistema_integrado.py).
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Errores con los que la caché Parquet se descarta y se usa el Excel:
+# - ImportError: no hay motor Parquet instalado (pyarrow)
+# - OSError: caché inexistente o directorio de datos de sólo lectura
+# - ValueError / TypeError: archivo corrupto o incompatible
+#   (pyarrow.ArrowInvalid y pyarrow.ArrowTypeError derivan de ellos)
+_ERRORES_CACHE = (ImportError, OSError, ValueError, TypeError)
+
+
+def leer_excel_cacheado(ruta_xlsx, sheet_name=0, **kwargs):
+    """
+    Lee una hoja Excel usando una copia Parquet junto al .xlsx como caché.
+
+    La caché sólo se usa si es al menos tan reciente como el .xlsx (mtime); si
+    no existe, está desactualizada o no se puede leer, se lee el Excel y se
+    intenta regenerarla. Si no se puede escribir, se devuelve el Excel sin caché.
+
+    La caché se identifica sólo por archivo y hoja, así que únicamente se usa en
+    lecturas de una hoja (nombre o índice) sin argumentos adicionales; con
+    **kwargs o varias hojas se lee el Excel directamente.
+
+    Args:
+        ruta_xlsx: Ruta del archivo .xlsx
+        sheet_name: Hoja a leer (la caché de una hoja con nombre lleva el sufijo _<hoja>)
+        **kwargs: Argumentos adicionales para pd.read_excel (desactivan la caché)
+
+    Returns:
+        DataFrame con los datos de la hoja (dict de DataFrames si sheet_name
+        es None o una lista, como pd.read_excel)
+    """
+    if kwargs or not isinstance(sheet_name, (str, int)):
+        return pd.read_excel(ruta_xlsx, sheet_name=sheet_name, **kwargs)
+
+    ruta_xlsx = Path(ruta_xlsx)
+    sufijo = "" if sheet_name == 0 else f"_{sheet_name}"
+    ruta_parquet = ruta_xlsx.with_name(f"{ruta_xlsx.stem}{sufijo}.parquet")
+
+    try:
+        if ruta_parquet.stat().st_mtime >= ruta_xlsx.stat().st_mtime:
+            return pd.read_parquet(ruta_parquet)
+    except _ERRORES_CACHE:
+        pass
+
+    df = pd.read_excel(ruta_xlsx, sheet_name=sheet_name)
+    try:
+        df.to_parquet(ruta_parquet, index=False)
+    except _ERRORES_CACHE:
+        pass
+    return df
+
+
+def trapecio_uniforme(y, x):
+    """
+    Regla del trapecio para muestras equiespaciadas (equivale a np.trapz(y, x)).
+
+    Se reduce a una única suma sobre los puntos interiores, sin arreglos temporales.
+
+    Args:
+        y: Valores a integrar
+        x: Tiempos de las muestras (p. ej. la columna Hora)
+
+    Returns:
+        Integral de y sobre x
+
+    Raises:
+        ValueError: Si x no es equiespaciado
+    """
+    x = np.asarray(x, dtype=np.float64)
+    dx = x[1] - x[0]
+    if not np.allclose(np.diff(x), dx):
+        raise ValueError("Los tiempos de la regla del trapecio deben ser equiespaciados")
+    return dx * (0.5 * (y[0] + y[-1]) + y[1:-1].sum())
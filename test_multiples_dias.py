@@ -3,12 +3,94 @@ Script para probar automáticamente diferentes días de autonomía
 y generar un reporte comparativo.
 """
 
+import matplotlib
+matplotlib.use("Agg")  # script por lotes: los gráficos sólo se guardan en 'results/'
+
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 import os
+from concurrent.futures import ThreadPoolExecutor
 from main import ejecutar_simulacion_completa, cargar_datos, calcular_energia_diaria
-from scripts.calcular_banco_baterias import calcular_banco_baterias
-from scripts.simular_soc import simular_soc_diario, analizar_resultados_soc
+from scripts.calcular_banco_baterias import calcular_banco_baterias_vectorizado
+from scripts.simular_soc import simular_soc_lote, analizar_resultados_soc
+
+plt.style.use('default')
+
+# Crear directorio de resultados si no existe (también cuando el módulo se importa)
+os.makedirs("results", exist_ok=True)
+
+# Columnas del comparativo, en el orden en que se guardan en el CSV
+_COLUMNAS_COMPARATIVO = (
+    'Dias_Autonomia', 'Capacidad_Banco_kWh', 'Total_Baterias',
+    'SOC_Min_Invierno', 'SOC_Min_Verano', 'SOC_Prom_Invierno', 'SOC_Prom_Verano',
+    'Horas_Criticas_Invierno', 'Horas_Criticas_Verano',
+    'Energia_Cargada_Invierno', 'Energia_Cargada_Verano',
+    'Energia_Descargada_Invierno', 'Energia_Descargada_Verano',
+    'Eficiencia_Invierno', 'Eficiencia_Verano'
+)
+
+# Columnas de SOC del comparativo (sin el sufijo de estación) y el campo de
+# analizar_resultados_soc del que se toman
+_CAMPOS_ANALISIS = {
+    'SOC_Min': 'SOC_Minimo',
+    'SOC_Prom': 'SOC_Promedio',
+    'Horas_Criticas': 'Horas_Criticas',
+    'Energia_Cargada': 'Energia_Cargada_kWh',
+    'Energia_Descargada': 'Energia_Descargada_kWh',
+    'Eficiencia': 'Eficiencia_Sistema'
+}
+
+# Evaluación según el peor caso de horas críticas entre estaciones: la
+# evaluación i corresponde a horas <= _UMBRALES_HORAS_CRITICAS[i]
+_UMBRALES_HORAS_CRITICAS = np.array([0, 2, 6, np.inf])
+_EVALUACIONES = (
+    "✅ EXCELENTE - Sin horas críticas",
+    "✅ BUENO - Pocas horas críticas",
+    "⚠️ ACEPTABLE - Algunas horas críticas",
+    "❌ INSUFICIENTE - Muchas horas críticas"
+)
+
+# Figura 2x2 del comparativo, creada en el primer gráfico y reutilizada después
+_FIG_COMPARATIVA = None
+
+
+def _obtener_figura_comparativa():
+    """
+    Devuelve la figura 2x2 del comparativo con sus ejes limpios, creándola
+    sólo si aún no existe o si ya fue cerrada.
+    
+    Returns:
+        tuple: (fig, ejes)
+    """
+    global _FIG_COMPARATIVA
+    if _FIG_COMPARATIVA is None or not plt.fignum_exists(_FIG_COMPARATIVA[0].number):
+        _FIG_COMPARATIVA = plt.subplots(2, 2, figsize=(16, 12))
+    fig, ejes = _FIG_COMPARATIVA
+    for ax in ejes.flat:
+        ax.clear()
+    return fig, ejes
+
+
+def cerrar_figura_comparativa():
+    """
+    Cierra la figura del comparativo (llamar al terminar de graficar).
+    """
+    global _FIG_COMPARATIVA
+    if _FIG_COMPARATIVA is not None:
+        plt.close(_FIG_COMPARATIVA[0])
+        _FIG_COMPARATIVA = None
+
+
+def _guardar_parquet(df, ruta):
+    """
+    Guarda una copia binaria y columnar del comparativo para barridos grandes;
+    se omite si no hay motor Parquet instalado (pyarrow).
+    """
+    try:
+        df.to_parquet(ruta, index=False)
+    except ImportError:
+        pass
 
 
 def simular_multiples_dias_autonomia_automatico():
@@ -23,9 +105,6 @@ def simular_multiples_dias_autonomia_automatico():
     # Días de autonomía a probar
     dias_autonomia_list = [1, 2, 3, 5, 7]
     
-    # Almacenar resultados
-    resultados_comparativos = []
-    
     # Cargar datos una sola vez
     invierno, verano = cargar_datos()
     if invierno is None or verano is None:
@@ -45,80 +124,83 @@ def simular_multiples_dias_autonomia_automatico():
         'eficiencia_descarga': 0.9
     }
     
-    for dias in dias_autonomia_list:
-        print(f"\n📅 Simulando para {dias} día(s) de autonomía...")
-        
-        # Calcular banco de baterías
-        resultados_banco = calcular_banco_baterias(
-            energia_diaria,
-            dias,
-            PARAMETROS['voltaje_sistema'],
-            PARAMETROS['profundidad_descarga'],
-            PARAMETROS['voltaje_bateria'],
-            PARAMETROS['capacidad_bateria_ah']
-        )
-        
-        capacidad_wh = resultados_banco["Capacidad Real [kWh]"] * 1000
-        
-        # Simular SOC
-        soc_invierno = simular_soc_diario(
-            invierno['Generacion_PV'],
-            invierno['Consumo'],
-            capacidad_wh,
-            PARAMETROS['soc_inicial'],
-            PARAMETROS['soc_minimo'],
-            PARAMETROS['eficiencia_carga'],
-            PARAMETROS['eficiencia_descarga']
-        )
-        
-        soc_verano = simular_soc_diario(
-            verano['Generacion_PV'],
-            verano['Consumo'],
-            capacidad_wh,
-            PARAMETROS['soc_inicial'],
-            PARAMETROS['soc_minimo'],
-            PARAMETROS['eficiencia_carga'],
-            PARAMETROS['eficiencia_descarga']
-        )
-        
-        # Analizar resultados
-        analisis_invierno = analizar_resultados_soc(soc_invierno)
-        analisis_verano = analizar_resultados_soc(soc_verano)
-        
-        # Almacenar resultados
-        resultado = {
-            'Dias_Autonomia': dias,
-            'Capacidad_Banco_kWh': resultados_banco["Capacidad Real [kWh]"],
-            'Total_Baterias': resultados_banco["Total Baterías"],
-            'SOC_Min_Invierno': analisis_invierno['SOC_Minimo'],
-            'SOC_Min_Verano': analisis_verano['SOC_Minimo'],
-            'SOC_Prom_Invierno': analisis_invierno['SOC_Promedio'],
-            'SOC_Prom_Verano': analisis_verano['SOC_Promedio'],
-            'Horas_Criticas_Invierno': analisis_invierno['Horas_Criticas'],
-            'Horas_Criticas_Verano': analisis_verano['Horas_Criticas'],
-            'Energia_Cargada_Invierno': analisis_invierno['Energia_Cargada_kWh'],
-            'Energia_Cargada_Verano': analisis_verano['Energia_Cargada_kWh'],
-            'Energia_Descargada_Invierno': analisis_invierno['Energia_Descargada_kWh'],
-            'Energia_Descargada_Verano': analisis_verano['Energia_Descargada_kWh'],
-            'Eficiencia_Invierno': analisis_invierno['Eficiencia_Sistema'],
-            'Eficiencia_Verano': analisis_verano['Eficiencia_Sistema']
-        }
-        
-        resultados_comparativos.append(resultado)
-        
-        print(f"  ✓ Completado: {dias} día(s) - {resultados_banco['Total Baterías']} baterías")
+    # Desempaquetar los parámetros una sola vez, en el orden de los argumentos
+    parametros_banco = tuple(
+        PARAMETROS[clave]
+        for clave in ('voltaje_sistema', 'profundidad_descarga', 'voltaje_bateria', 'capacidad_bateria_ah')
+    )
+    parametros_soc = tuple(
+        PARAMETROS[clave]
+        for clave in ('soc_inicial', 'soc_minimo', 'eficiencia_carga', 'eficiencia_descarga')
+    )
     
-    # Crear DataFrame comparativo
-    df_comparativo = pd.DataFrame(resultados_comparativos)
+    # Extraer las series de cada estación como arreglos float64 una sola vez,
+    # apiladas (invierno, verano) para simular ambas estaciones juntas
+    generacion = np.stack([
+        invierno['Generacion_PV'].to_numpy(np.float64),
+        verano['Generacion_PV'].to_numpy(np.float64)
+    ])
+    consumo = np.stack([
+        invierno['Consumo'].to_numpy(np.float64),
+        verano['Consumo'].to_numpy(np.float64)
+    ])
     
-    # Guardar resultados
-    df_comparativo.to_csv("results/comparacion_dias_autonomia.csv", index=False)
+    # Dimensionar el banco para todos los valores de autonomía a la vez
+    bancos = calcular_banco_baterias_vectorizado(energia_diaria, dias_autonomia_list, *parametros_banco)
+    capacidades_kwh = bancos[:, 4]
+    totales_baterias = bancos[:, 3].astype(int)
     
-    # Generar gráficos comparativos
-    generar_graficos_comparativos(df_comparativo)
+    # Simular SOC de todas las combinaciones (días de autonomía × estación) en una
+    # sola llamada al kernel: la fila 2*i es invierno y la 2*i + 1 verano del valor i
+    num_valores = len(dias_autonomia_list)
+    print(f"\n📅 Simulando {2 * num_valores} configuraciones ({num_valores} valores de autonomía × 2 estaciones)...")
+    simulaciones = simular_soc_lote(
+        np.tile(generacion, (num_valores, 1)),
+        np.tile(consumo, (num_valores, 1)),
+        np.repeat(capacidades_kwh * 1000, 2),
+        *parametros_soc
+    )
     
-    # Generar reporte
-    generar_reporte_comparativo(df_comparativo)
+    # Analizar resultados de cada estación
+    analisis = {'Invierno': [], 'Verano': []}
+    for i, dias in enumerate(dias_autonomia_list):
+        print(f"\n📊 Analizando resultados para {dias} día(s) de autonomía...")
+        analisis['Invierno'].append(analizar_resultados_soc(simulaciones[2 * i]))
+        analisis['Verano'].append(analizar_resultados_soc(simulaciones[2 * i + 1]))
+        print(f"  ✓ Completado: {dias} día(s) - {totales_baterias[i]} baterías")
+    
+    # Crear DataFrame comparativo columna a columna: las del banco salen de los
+    # arreglos del dimensionamiento y las de SOC de los análisis por estación
+    resultados_comparativos = {
+        'Dias_Autonomia': np.asarray(dias_autonomia_list),
+        'Capacidad_Banco_kWh': capacidades_kwh,
+        'Total_Baterias': totales_baterias
+    }
+    for estacion, analisis_estacion in analisis.items():
+        for prefijo, campo in _CAMPOS_ANALISIS.items():
+            resultados_comparativos[f'{prefijo}_{estacion}'] = [a[campo] for a in analisis_estacion]
+    df_comparativo = pd.DataFrame(resultados_comparativos, columns=_COLUMNAS_COMPARATIVO)
+    
+    # Guardar resultados en hilos mientras se generan el gráfico y el reporte.
+    # Éstos quedan en el hilo principal: pyplot no es seguro entre hilos y
+    # ambos imprimen en consola, cuyo orden se mantiene así
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        escrituras = [
+            pool.submit(df_comparativo.to_csv, "results/comparacion_dias_autonomia.csv", index=False),
+            pool.submit(_guardar_parquet, df_comparativo, "results/comparacion_dias_autonomia.parquet")
+        ]
+        
+        # Generar gráficos comparativos
+        try:
+            generar_graficos_comparativos(df_comparativo)
+        finally:
+            cerrar_figura_comparativa()
+        
+        # Generar reporte
+        generar_reporte_comparativo(df_comparativo)
+        
+        for escritura in escrituras:
+            escritura.result()
     
     print(f"\n✅ Simulación automática completada!")
     print(f"📊 Resultados guardados en 'results/comparacion_dias_autonomia.csv'")
@@ -131,62 +213,57 @@ def generar_graficos_comparativos(df):
     Genera gráficos comparativos para diferentes días de autonomía.
     """
     
-    # Configurar estilo
-    plt.style.use('default')
-    plt.rcParams['figure.figsize'] = (15, 10)
+    # Figura con subplots (reutilizada entre llamadas)
+    fig, ((ax1, ax2), (ax3, ax4)) = _obtener_figura_comparativa()
+    
+    dias = df['Dias_Autonomia'].to_numpy()
     
-    # Crear figura con subplots
-    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
+    # Series de los cuatro gráficos: (eje, columna, estilo, etiqueta)
+    series = (
+        (ax1, 'Capacidad_Banco_kWh', 'bo-', None),
+        (ax2, 'SOC_Min_Invierno', 'ro-', 'Invierno'),
+        (ax2, 'SOC_Min_Verano', 'go-', 'Verano'),
+        (ax3, 'Horas_Criticas_Invierno', 'ro-', 'Invierno'),
+        (ax3, 'Horas_Criticas_Verano', 'go-', 'Verano'),
+        (ax4, 'Eficiencia_Invierno', 'ro-', 'Invierno'),
+        (ax4, 'Eficiencia_Verano', 'go-', 'Verano')
+    )
+    for ax, columna, estilo, etiqueta in series:
+        ax.plot(dias, df[columna].to_numpy(), estilo, linewidth=2, markersize=8, label=etiqueta)
     
-    dias = df['Dias_Autonomia']
+    # Formato común: todos los gráficos comparten el eje de días de autonomía
+    for ax in (ax1, ax2, ax3, ax4):
+        ax.set_xlabel('Días de Autonomía')
+        ax.grid(True, alpha=0.3)
+        ax.set_xticks(dias)
     
     # Gráfico 1: Capacidad del banco vs Días de autonomía
-    ax1.plot(dias, df['Capacidad_Banco_kWh'], 'bo-', linewidth=2, markersize=8)
-    ax1.set_xlabel('Días de Autonomía')
     ax1.set_ylabel('Capacidad del Banco (kWh)')
     ax1.set_title('Capacidad del Banco vs Días de Autonomía')
-    ax1.grid(True, alpha=0.3)
-    ax1.set_xticks(dias)
     
     # Gráfico 2: SOC mínimo por estación
-    ax2.plot(dias, df['SOC_Min_Invierno'], 'ro-', linewidth=2, markersize=8, label='Invierno')
-    ax2.plot(dias, df['SOC_Min_Verano'], 'go-', linewidth=2, markersize=8, label='Verano')
     ax2.axhline(y=0.2, color='red', linestyle='--', alpha=0.7, label='SOC Mínimo (20%)')
     ax2.axhline(y=0.3, color='orange', linestyle='--', alpha=0.7, label='SOC Crítico (30%)')
-    ax2.set_xlabel('Días de Autonomía')
     ax2.set_ylabel('SOC Mínimo')
     ax2.set_title('SOC Mínimo vs Días de Autonomía')
     ax2.legend()
-    ax2.grid(True, alpha=0.3)
-    ax2.set_xticks(dias)
     ax2.set_ylim(0, 1)
     
     # Gráfico 3: Horas críticas
-    ax3.plot(dias, df['Horas_Criticas_Invierno'], 'ro-', linewidth=2, markersize=8, label='Invierno')
-    ax3.plot(dias, df['Horas_Criticas_Verano'], 'go-', linewidth=2, markersize=8, label='Verano')
-    ax3.set_xlabel('Días de Autonomía')
     ax3.set_ylabel('Horas Críticas (SOC < 30%)')
     ax3.set_title('Horas Críticas vs Días de Autonomía')
     ax3.legend()
-    ax3.grid(True, alpha=0.3)
-    ax3.set_xticks(dias)
     
     # Gráfico 4: Eficiencia del sistema
-    ax4.plot(dias, df['Eficiencia_Invierno'], 'ro-', linewidth=2, markersize=8, label='Invierno')
-    ax4.plot(dias, df['Eficiencia_Verano'], 'go-', linewidth=2, markersize=8, label='Verano')
     ax4.axhline(y=0.85, color='green', linestyle='--', alpha=0.7, label='Eficiencia Óptima (85%)')
     ax4.axhline(y=0.70, color='orange', linestyle='--', alpha=0.7, label='Eficiencia Mínima (70%)')
-    ax4.set_xlabel('Días de Autonomía')
     ax4.set_ylabel('Eficiencia del Sistema')
     ax4.set_title('Eficiencia vs Días de Autonomía')
     ax4.legend()
-    ax4.grid(True, alpha=0.3)
-    ax4.set_xticks(dias)
     ax4.set_ylim(0, 1)
     
-    plt.tight_layout()
-    plt.savefig("results/comparacion_dias_autonomia.png", dpi=300, bbox_inches='tight')
-    plt.show()
+    fig.tight_layout()
+    fig.savefig("results/comparacion_dias_autonomia.png", dpi=300, bbox_inches='tight')
     
     print("  ✓ Gráfico comparativo guardado como 'results/comparacion_dias_autonomia.png'")
 
@@ -196,7 +273,8 @@ def generar_reporte_comparativo(df):
     Genera un reporte de texto comparativo.
     """
     
-    reporte = f"""
+    # El reporte se arma por partes y se une una sola vez al final
+    partes = [f"""
 REPORTE COMPARATIVO - DÍAS DE AUTONOMÍA
 {'='*60}
 
@@ -205,30 +283,25 @@ ENERGÍA DIARIA DEL SISTEMA: {df['Energia_Cargada_Invierno'].iloc[0] + df['Energ
 RESUMEN POR DÍAS DE AUTONOMÍA:
 {'='*60}
 
-"""
+"""]
     
-    for _, row in df.iterrows():
-        dias = row['Dias_Autonomia']
-        capacidad = row['Capacidad_Banco_kWh']
-        baterias = row['Total_Baterias']
-        soc_min_inv = row['SOC_Min_Invierno']
-        soc_min_ver = row['SOC_Min_Verano']
-        horas_crit_inv = row['Horas_Criticas_Invierno']
-        horas_crit_ver = row['Horas_Criticas_Verano']
-        efic_inv = row['Eficiencia_Invierno']
-        efic_ver = row['Eficiencia_Verano']
-        
-        # Evaluación del sistema
-        if horas_crit_inv == 0 and horas_crit_ver == 0:
-            evaluacion = "✅ EXCELENTE - Sin horas críticas"
-        elif horas_crit_inv <= 2 and horas_crit_ver <= 2:
-            evaluacion = "✅ BUENO - Pocas horas críticas"
-        elif horas_crit_inv <= 6 and horas_crit_ver <= 6:
-            evaluacion = "⚠️ ACEPTABLE - Algunas horas críticas"
-        else:
-            evaluacion = "❌ INSUFICIENTE - Muchas horas críticas"
+    # Evaluación del sistema para todas las filas a la vez
+    peores_horas = np.maximum(df['Horas_Criticas_Invierno'].to_numpy(), df['Horas_Criticas_Verano'].to_numpy())
+    indices_evaluacion = np.searchsorted(_UMBRALES_HORAS_CRITICAS, peores_horas, side='left')
+    
+    for row, indice_evaluacion in zip(df.itertuples(index=False), indices_evaluacion):
+        dias = row.Dias_Autonomia
+        capacidad = row.Capacidad_Banco_kWh
+        baterias = row.Total_Baterias
+        soc_min_inv = row.SOC_Min_Invierno
+        soc_min_ver = row.SOC_Min_Verano
+        horas_crit_inv = row.Horas_Criticas_Invierno
+        horas_crit_ver = row.Horas_Criticas_Verano
+        efic_inv = row.Eficiencia_Invierno
+        efic_ver = row.Eficiencia_Verano
+        evaluacion = _EVALUACIONES[indice_evaluacion]
         
-        reporte += f"""
+        partes.append(f"""
 {dias} DÍA(S) DE AUTONOMÍA:
 - Capacidad del banco: {capacidad:.2f} kWh
 - Total de baterías: {baterias}
@@ -239,37 +312,39 @@ RESUMEN POR DÍAS DE AUTONOMÍA:
 - Eficiencia invierno: {efic_inv:.1%}
 - Eficiencia verano: {efic_ver:.1%}
 - Evaluación: {evaluacion}
-"""
+""")
     
     # Recomendación final
-    reporte += f"""
+    partes.append(f"""
 {'='*60}
 RECOMENDACIÓN FINAL:
 {'='*60}
 
-"""
+""")
     
-    # Encontrar la mejor opción
+    # Encontrar la mejor opción: la de menos días sin horas críticas en ninguna estación
+    sin_horas_criticas = (df['Horas_Criticas_Invierno'] == 0) & (df['Horas_Criticas_Verano'] == 0)
+    candidatos = df[sin_horas_criticas]
     mejor_opcion = None
-    for _, row in df.iterrows():
-        if row['Horas_Criticas_Invierno'] == 0 and row['Horas_Criticas_Verano'] == 0:
-            if mejor_opcion is None or row['Dias_Autonomia'] < mejor_opcion['Dias_Autonomia']:
-                mejor_opcion = row
+    if not candidatos.empty:
+        mejor_opcion = next(candidatos.nsmallest(1, 'Dias_Autonomia').itertuples(index=False))
     
     if mejor_opcion is not None:
-        reporte += f"""
-✅ RECOMENDACIÓN ÓPTIMA: {mejor_opcion['Dias_Autonomia']} día(s) de autonomía
-- Capacidad: {mejor_opcion['Capacidad_Banco_kWh']:.2f} kWh
-- Baterías: {mejor_opcion['Total_Baterias']}
+        partes.append(f"""
+✅ RECOMENDACIÓN ÓPTIMA: {mejor_opcion.Dias_Autonomia} día(s) de autonomía
+- Capacidad: {mejor_opcion.Capacidad_Banco_kWh:.2f} kWh
+- Baterías: {mejor_opcion.Total_Baterias}
 - Sin horas críticas en ninguna estación
 - Eficiencia excelente
-"""
+""")
     else:
-        reporte += f"""
+        partes.append(f"""
 ⚠️ RECOMENDACIÓN: Considerar aumentar la capacidad del sistema
 - Ninguna configuración logra eliminar completamente las horas críticas
 - Se recomienda al menos {df['Dias_Autonomia'].max() + 1} días de autonomía
-"""
+""")
+    
+    reporte = "".join(partes)
     
     # Guardar reporte
     with open("results/reporte_comparativo.txt", 'w', encoding='utf-8') as f:
@@ -283,8 +358,5 @@ if __name__ == "__main__":
     print("🚀 SIMULADOR COMPARATIVO - DÍAS DE AUTONOMÍA")
     print("="*70)
     
-    # Crear directorio de resultados si no existe
-    os.makedirs("results", exist_ok=True)
-    
     # Ejecutar simulación automática
     simular_multiples_dias_autonomia_automatico() 
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""
+Pruebas de la simulación de SOC: la simulación por lotes debe coincidir con la
+diaria, y los kernels compilados con numba (si está instalado) con su versión
+en Python puro.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from scripts import simular_soc
+
+CAPACIDADES_WH = (800.0, 3000.0, 31310.0)
+
+
+def _series_estaciones():
+    """Generación y consumo de invierno y verano apilados en arreglos (2, N)."""
+    datos = [
+        pd.read_csv(RAIZ / "data" / f"datos_sistema_fotovoltaico_{estacion}.csv")
+        for estacion in ("invierno", "verano")
+    ]
+    generacion = np.stack([df["Generacion_PV"].to_numpy(np.float64) for df in datos])
+    consumo = np.stack([df["Consumo"].to_numpy(np.float64) for df in datos])
+    return generacion, consumo
+
+
+def test_simular_soc_lote_igual_a_diario():
+    generacion, consumo = _series_estaciones()
+    for capacidad in CAPACIDADES_WH:
+        lote = simular_soc.simular_soc_lote(generacion, consumo, capacidad, 1.0, 0.2, 0.9, 0.85)
+        for k, resultado in enumerate(lote):
+            esperado = simular_soc.simular_soc_diario(
+                generacion[k], consumo[k], capacidad, 1.0, 0.2, 0.9, 0.85
+            )
+            pd.testing.assert_frame_equal(resultado, esperado, check_exact=True)
+            assert resultado.attrs == esperado.attrs
+
+
+def test_soc_kernel_numba_igual_a_python():
+    pytest.importorskip("numba")
+    generacion, consumo = _series_estaciones()
+    for capacidad in CAPACIDADES_WH:
+        for k in range(generacion.shape[0]):
+            argumentos = (generacion[k], consumo[k], capacidad, 0.5 * capacidad, 0.2 * capacidad, 0.9, 0.85)
+            compilado = simular_soc._soc_kernel(*argumentos)
+            python = simular_soc._soc_kernel.py_func(*argumentos)
+            for a, b in zip(compilado, python):
+                np.testing.assert_array_equal(a, b)
+
+
+def test_soc_kernel_lote_numba_igual_a_python():
+    pytest.importorskip("numba")
+    generacion, consumo = _series_estaciones()
+    # Barrido de capacidades (una por fila) sobre ambas estaciones, como en test_multiples_dias
+    capacidades = np.repeat(np.array(CAPACIDADES_WH), 2)
+    generacion = np.tile(generacion, (len(CAPACIDADES_WH), 1))
+    consumo = np.tile(consumo, (len(CAPACIDADES_WH), 1))
+    argumentos = (generacion, consumo, capacidades, 1.0 * capacidades, 0.2 * capacidades, 0.9, 0.85)
+
+    compilado = simular_soc._soc_kernel_lote(*argumentos)
+    for k in range(generacion.shape[0]):
+        python = simular_soc._soc_kernel.py_func(
+            generacion[k], consumo[k], capacidades[k], capacidades[k], 0.2 * capacidades[k], 0.9, 0.85
+        )
+        for serie, esperado in enumerate(python):
+            np.testing.assert_array_equal(compilado[serie, k], esperado)
@@ -0,0 +1,46 @@
+"""
+Pruebas de las utilidades compartidas de lectura de datos e integración.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from scripts.utilidades import leer_excel_cacheado, trapecio_uniforme
+
+
+def test_trapecio_uniforme_igual_a_trapz():
+    horas = np.arange(0.0, 24.0, 0.5)
+    y = np.sin(horas / 24.0 * np.pi) ** 2
+    assert trapecio_uniforme(y, horas) == pytest.approx(np.trapz(y, horas))
+
+
+def test_trapecio_uniforme_rechaza_horas_no_equiespaciadas():
+    with pytest.raises(ValueError):
+        trapecio_uniforme(np.ones(4), np.array([0.0, 1.0, 2.0, 4.0]))
+
+
+def test_leer_excel_cacheado_usa_cache_solo_sin_argumentos(tmp_path):
+    pytest.importorskip("openpyxl")
+    pytest.importorskip("pyarrow")
+    ruta = tmp_path / "cargas.xlsx"
+    pd.DataFrame({"Hora": [0.0, 0.5, 1.0], "Carga": [1.0, 2.0, 3.0]}).to_excel(ruta, index=False)
+
+    completo = leer_excel_cacheado(ruta)
+    assert (tmp_path / "cargas.parquet").exists()
+    pd.testing.assert_frame_equal(leer_excel_cacheado(ruta), completo)
+
+    # Con argumentos de read_excel no se devuelve la caché de la lectura anterior
+    parcial = leer_excel_cacheado(ruta, usecols=["Hora"], skiprows=[1])
+    assert list(parcial.columns) == ["Hora"]
+    assert len(parcial) == 2
+
+    # Varias hojas: se devuelve el dict de pd.read_excel sin pasar por la caché
+    hojas = leer_excel_cacheado(ruta, sheet_name=None)
+    assert isinstance(hojas, dict)